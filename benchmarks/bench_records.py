@@ -0,0 +1,179 @@
+"""
+Compare memory and generation time of the slotted Ship and ShieldBooster records with the plain classes they replaced.
+The plain classes are reproduced below: a __dict__ per instance, the raw coriolis slots and copy.deepcopy for booster variants.
+Catalogs are --scales times the size of the current one (38 ships, 20 booster variants).
+"""
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import create_data_file as cdf  # noqa: E402
+import synthetic  # noqa: E402
+
+SHIP_COUNT = 38
+
+
+class LegacyShip:
+    def __init__(self):
+        self.name = ""
+        self.symbol = ""
+        self.highest_internal = 0
+        self.utility_slots_amount = 0
+        self.armour = ""
+        self.power_plant = ""
+        self.thrusters = ""
+        self.frame_shift_drive = ""
+        self.life_support = ""
+        self.power_distributor = ""
+        self.sensors = ""
+        self.fuel_tank = ""
+        self.base_shield_strength = 0
+        self.hull_mass = 0
+        self.slots = ""
+        self.ship_class = 0
+
+    def generate_data_entry(self):
+        modules = list()
+        loadout_template = {"event": "Loadout", "Ship": self.symbol, "Modules": modules}
+        for module, slot in ((self.armour, "armour"), (self.power_plant, "powerplant"), (self.thrusters, "mainengines"),
+                             (self.frame_shift_drive, "frameshiftdrive"), (self.life_support, "lifesupport"),
+                             (self.power_distributor, "powerdistributor"), (self.fuel_tank, "fueltank"), (self.sensors, "radar"),
+                             ("int_planetapproachsuite", "planetaryapproachsuite"), ("modularcargobaydoor", "cargohatch")):
+            modules.append(cdf.Utilities.generate_module_attributes(module, slot))
+        return {"ship": self.name,
+                "symbol": self.symbol,
+                "loadout_template": loadout_template,
+                "baseShieldStrength": self.base_shield_strength,
+                "hullMass": self.hull_mass,
+                "utility_slots": self.utility_slots_amount,
+                "highest_internal": self.highest_internal,
+                "slot_layout": self.slots,
+                "ship_class": self.ship_class}
+
+    @staticmethod
+    def create_from_json(json_ships, standard_modules, ship_name_to_symbol):
+        json_ship = next(iter(json_ships.values()))
+        ship = LegacyShip()
+        ship.name = json_ship["properties"]["name"]
+        ship.symbol = ship_name_to_symbol.get(ship.name.lower(), ship.name)
+        ship.base_shield_strength = json_ship["properties"]["baseShieldStrength"]
+        ship.hull_mass = json_ship["properties"]["hullMass"]
+        ship.ship_class = json_ship["properties"].get("class", 0)
+        standards = json_ship["defaults"]["standard"]
+        modules = [cdf.Ship._search_standard_module(standard_modules[module_name], standard, module_name, ship.name)
+                   for module_name, standard in zip(cdf.MODULES_STANDARD_FILE_NAMES, standards)]
+        (ship.power_plant, ship.thrusters, ship.frame_shift_drive, ship.life_support, ship.power_distributor, ship.sensors,
+         ship.fuel_tank) = modules
+        ship.armour = "{}_armour_grade1".format(ship.symbol)
+        ship.slots = json_ship["slots"]
+        ship.highest_internal = json_ship["slots"]["internal"][0]
+        ship.utility_slots_amount = json_ship["slots"]["hardpoints"].count(0)
+        return ship
+
+
+class LegacyShieldBooster:
+    # the engineering methods only use attributes, they work on both classes
+    apply_engineered = cdf.ShieldBooster.apply_engineered
+    apply_experimental = cdf.ShieldBooster.apply_experimental
+    generate_data_entry = cdf.ShieldBooster.generate_data_entry
+
+    def __init__(self, booster: cdf.ShieldBooster):
+        for attribute in cdf.ShieldBooster.__slots__:
+            setattr(self, attribute, getattr(booster, attribute))
+
+    @staticmethod
+    def create_engineered(default_booster, blueprint, specials, modifier_actions, grade, roll):
+        variations = list()
+        booster_prototype = copy.deepcopy(default_booster)
+        booster_prototype.apply_engineered(blueprint, grade, roll)
+        for special_name in sorted(cdf.MODULE_SHIELD_BOOSTER_ENGINEERING_SPECIALS):
+            booster_variation = copy.deepcopy(booster_prototype)
+            booster_variation.apply_experimental(special_name, specials, modifier_actions)
+            variations.append(booster_variation)
+        return variations
+
+
+def measure(function, *args):
+    """
+    :return: seconds, bytes still allocated by the result and the result
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed, retained, result
+
+
+def create_ships(ship_class, texts, standard_modules, ship_name_to_symbol):
+    # every file is parsed on its own like the build does, the ships keep what they reference
+    return [ship_class.create_from_json(json.loads(text), standard_modules, ship_name_to_symbol) for text in texts]
+
+
+def create_boosters(booster_class, default_booster, variants, blueprints, specials, actions):
+    boosters = list()
+    for blueprint_symbol, grade, roll in variants:
+        boosters += booster_class.create_engineered(default_booster, blueprints[blueprint_symbol], specials, actions, grade, roll)
+    return boosters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the slotted Ship and ShieldBooster records against plain classes.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 100], help="catalog size multipliers (default: %(default)s)")
+    args = parser.parse_args()
+
+    print("{:>10} {:>7} {:>8} {:>10} {:>10} {:>11} {:>11}".format("records", "scale", "count", "plain", "slotted", "plain mem", "slotted mem"))
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as root:
+            ship_files = synthetic.write_tree(root, ship_count=SHIP_COUNT * scale)
+            coriolis = os.path.join(root, "coriolis-data")
+            standard_modules = cdf.load_standard_modules(os.path.join(coriolis, "modules", "standard"))
+            ship_name_to_symbol = cdf.load_ship_name_to_symbol(os.path.join(root, "FDevIDs", "shipyard.csv"))
+            texts = list()
+            for ship_file in ship_files:
+                with open(ship_file) as json_file:
+                    texts.append(json_file.read())
+            with open(os.path.join(coriolis, "modifications", "blueprints.json")) as json_file:
+                blueprints = json.load(json_file)
+            with open(os.path.join(coriolis, "modifications", "specials.json")) as json_file:
+                specials = json.load(json_file)
+            with open(os.path.join(coriolis, "modifications", "modifierActions.json")) as json_file:
+                actions = json.load(json_file)
+            with open(os.path.join(coriolis, "modules", "hardpoints", "shield_booster.json")) as json_file:
+                booster_json = next(x for x in next(iter(json.load(json_file).values())) if x["rating"] == "A")
+
+        results = list()
+        for ship_class in (LegacyShip, cdf.Ship):
+            elapsed, retained, ships = measure(create_ships, ship_class, texts, standard_modules, ship_name_to_symbol)
+            start = time.perf_counter()
+            entries = [ship.generate_data_entry() for ship in ships]
+            results.append((elapsed + time.perf_counter() - start, retained, entries))
+        if results[0][2] != results[1][2]:
+            sys.exit("slotted ships produced different entries")
+        print("{:>10} {:>7} {:>8} {:>9.3f}s {:>9.3f}s {:>10.1f}K {:>10.1f}K".format(
+            "ships", scale, len(texts), results[0][0], results[1][0], results[0][1] / 1024, results[1][1] / 1024))
+
+        default_booster = cdf.ShieldBooster.create_from_json(booster_json)
+        # grade 5 with the best roll is the default build, scale repeats it
+        variants = [(symbol, 5, 1) for symbol in sorted(cdf.MODULE_SHIELD_BOOSTER_ENGINEERING_BLUEPRINTS)] * scale
+        results = list()
+        for booster_class, default in ((LegacyShieldBooster, LegacyShieldBooster(default_booster)), (cdf.ShieldBooster, default_booster)):
+            elapsed, retained, boosters = measure(create_boosters, booster_class, default, variants, blueprints, specials, actions)
+            start = time.perf_counter()
+            entries = [booster.generate_data_entry(default) for booster in boosters]
+            results.append((elapsed + time.perf_counter() - start, retained, entries))
+        if results[0][2] != results[1][2]:
+            sys.exit("slotted boosters produced different entries")
+        print("{:>10} {:>7} {:>8} {:>9.3f}s {:>9.3f}s {:>10.1f}K {:>10.1f}K".format(
+            "boosters", scale, len(results[0][2]), results[0][0], results[1][0], results[0][1] / 1024, results[1][1] / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Time serial and parallel loading of ship files on synthetic corpora of different sizes. Every run parses all ship files.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import create_data_file as cdf  # noqa: E402
+import synthetic  # noqa: E402
+
+
+def best_time(repeat: int, function, *args, **kwargs):
+    best = None
+    result = None
+    for _ in range(repeat):
+        # load_ship reads through source_loader, a new one without a directory makes every run parse the files again.
+        # Process workers are created by the run, they start with the new loader as well.
+        cdf.source_loader = cdf.SourceLoader()
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial against parallel ship ingestion.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="number of ship files (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of workers (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best one is reported (default: %(default)s)")
+    args = parser.parse_args()
+
+    print("{:>8} {:>10} {:>10} {:>10} {:>9} {:>9}".format("ships", "serial", "process", "thread", "speedup", "speedup"))
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as root:
+            synthetic.write_tree(root, ship_count=size)
+            standard_modules = cdf.load_standard_modules(os.path.join(root, "coriolis-data", "modules", "standard"))
+            ship_name_to_symbol = cdf.load_ship_name_to_symbol(os.path.join(root, "FDevIDs", "shipyard.csv"))
+            ship_files = cdf.find_ship_files(os.path.join(root, "coriolis-data", "ships"))
+
+            serial, expected = best_time(args.repeat, cdf.load_ships, ship_files, standard_modules, ship_name_to_symbol)
+            timings = [serial]
+            for executor in ("process", "thread"):
+                elapsed, result = best_time(args.repeat, cdf.load_ships, ship_files, standard_modules, ship_name_to_symbol,
+                                            workers=args.workers, executor=executor)
+                if result != expected:
+                    sys.exit("{} pool produced different ships".format(executor))
+                timings.append(elapsed)
+
+        print("{:>8} {:>9.3f}s {:>9.3f}s {:>9.3f}s {:>8.2f}x {:>8.2f}x".format(size, *timings, serial / timings[1], serial / timings[2]))
+
+
+if __name__ == '__main__':
+    main()
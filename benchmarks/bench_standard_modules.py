@@ -0,0 +1,60 @@
+"""
+Time the lookup of standard modules by class and rating with a linear scan against the index of Ship.index_standard_modules.
+The synthetic catalogs are enlarged by --scales to model modded or future data.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import create_data_file as cdf  # noqa: E402
+import synthetic  # noqa: E402
+
+
+def linear_scan(standard_modules, module_class, module_rating):
+    # the lookup used before the modules were indexed
+    for standard_module in next(iter(standard_modules.values())):
+        if standard_module["class"] == module_class and standard_module["rating"] == module_rating:
+            return standard_module["symbol"]
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lookup of standard modules.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="catalog size multipliers (default: %(default)s)")
+    parser.add_argument("--lookups", type=int, default=100000, help="lookups per catalog (default: %(default)s)")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    print("{:>6} {:>8} {:>10} {:>10} {:>10} {:>9}".format("scale", "modules", "scan", "index", "indexing", "speedup"))
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as root:
+            synthetic.write_tree(root, ship_count=1, module_scale=scale)
+            with open(os.path.join(root, "coriolis-data", "modules", "standard", cdf.MODULES_STANDARD_FILE_NAMES[cdf.MODULE_NAME_POWER_PLANT])) as module_file:
+                catalog = json.load(module_file)
+
+        modules = next(iter(catalog.values()))
+        queries = [(x["class"], x["rating"]) for x in (rng.choice(modules) for _ in range(args.lookups))]
+
+        start = time.perf_counter()
+        expected = [linear_scan(catalog, module_class, module_rating) for module_class, module_rating in queries]
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = cdf.Ship.index_standard_modules(catalog)
+        indexing = time.perf_counter() - start
+        start = time.perf_counter()
+        result = [index.get(query) for query in queries]
+        lookup = time.perf_counter() - start
+
+        if result != expected:
+            sys.exit("index returned different modules")
+        print("{:>6} {:>8} {:>9.3f}s {:>9.3f}s {:>9.4f}s {:>8.1f}x".format(scale, len(modules), scan, lookup, indexing, scan / (lookup + indexing)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Check that ShieldBoosterTable produces the same shield booster variants and combinations as the scalar ShieldBooster code.
+Reads coriolis-data from --root like create_data_file.py. Exits with status 1 if any value differs.
+"""
+import os
+import sys
+import itertools
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import create_data_file as cdf  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the numpy shield booster engine with the scalar code.")
+    parser.add_argument("--root", default=".", metavar="DIR", help="directory containing coriolis-data (default: %(default)s)")
+    parser.add_argument("--boosters", type=int, default=4, help="compare all combinations up to this many boosters (default: %(default)s)")
+    parser.add_argument("--places", type=int, default=4, help="decimal places that have to match (default: %(default)s)")
+    args = parser.parse_args()
+    if cdf.numpy is None:
+        sys.exit("numpy is not installed")
+
+    source = cdf.SourceRoot(os.path.abspath(args.root))
+    blueprints = cdf.source_loader.load_json(source.engineering_blueprints)
+    specials = cdf.source_loader.load_json(source.engineering_specials)
+    actions = cdf.source_loader.load_json(source.engineering_special_actions)
+    booster_json = next(x for x in next(iter(cdf.source_loader.load_json(source.shield_booster).values())) if x["rating"] == "A")
+    default_booster = cdf.ShieldBooster.create_from_json(booster_json)
+
+    blueprint_symbols = sorted(cdf.MODULE_SHIELD_BOOSTER_ENGINEERING_BLUEPRINTS)
+    scalar = list()
+    for blueprint_symbol in blueprint_symbols:
+        scalar += cdf.ShieldBooster.create_engineered(default_booster, blueprints[blueprint_symbol], specials, actions)
+    table = cdf.ShieldBoosterTable.create_engineered([default_booster], [blueprints[x] for x in blueprint_symbols], specials, actions)
+
+    tolerance = 0.5 * 10 ** -args.places
+    mismatches = 0
+    for row, booster in enumerate(scalar):
+        if (booster.engineering_symbol, booster.experimental_symbol) != (table.engineering[row][1], table.experimental[row][1]):
+            print("row {}: expected {} {}".format(row, booster.engineering_symbol, booster.experimental_symbol))
+            mismatches += 1
+        for column, attribute in cdf.ShieldBoosterTable.ATTRIBUTES.items():
+            expected, actual = getattr(booster, attribute), float(table.columns[column][row])
+            if abs(expected - actual) > tolerance:
+                print("row {} {}: expected {}, got {}".format(row, column, expected, actual))
+                mismatches += 1
+
+    for boosters in range(1, args.boosters + 1):
+        indices = cdf.numpy.array(list(itertools.combinations_with_replacement(range(len(scalar)), boosters)))
+        combined = table.combine(indices)
+        for multiset, row in zip(indices.tolist(), combined.tolist()):
+            expected = [1 + sum(scalar[i].shield_boost for i in multiset)]
+            for attribute in ("explres", "kinres", "thermres"):
+                modifier = 1
+                for i in multiset:
+                    modifier *= 1 - getattr(scalar[i], attribute)
+                expected.append(1 - cdf.apply_diminishing_returns(modifier))
+            if any(abs(e - a) > tolerance for e, a in zip(expected, row)):
+                print("boosters {}: expected {}, got {}".format(multiset, expected, row))
+                mismatches += 1
+        print("{} booster(s): {} combinations compared".format(boosters, len(indices)))
+
+    print("{} variants compared, {} mismatches".format(len(scalar), mismatches))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
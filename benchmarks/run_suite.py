@@ -0,0 +1,243 @@
+"""
+Offline regression and throughput suite of create_data_file.py, run it with: python benchmarks/run_suite.py
+
+1. parity: build the small copy of coriolis-data and FDevIDs in benchmarks/fixtures with several options and compare the output with
+   the golden files in benchmarks/golden. Numbers may differ by --tolerance, relative to their size if they are larger than 1.
+   Every file a build writes is compared: the data files of all shards, the booster tables and the columns read back by map_columns.
+2. throughput: build synthetic catalogs --scales times the size of the current one and report build time, peak memory and output size.
+
+Exits with status 1 if any output differs from its golden file. After an intended change of the output, --update-golden rewrites the
+golden files. --update-fixtures SOURCE_ROOT copies a few ships and the module files of a checkout with coriolis-data and FDevIDs.
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import struct
+import hashlib
+import shutil
+import argparse
+import tempfile
+import subprocess
+from typing import List, Dict
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+import create_data_file as cdf  # noqa: E402
+import synthetic  # noqa: E402
+
+SCRIPT = os.path.join(os.path.dirname(BENCHMARKS), "create_data_file.py")
+FIXTURES = os.path.join(BENCHMARKS, "fixtures")
+GOLDEN = os.path.join(BENCHMARKS, "golden")
+SHIP_COUNT = 38  # ships in coriolis-data
+
+# name, options and golden file of every parity build, builds that must not change the data share a golden file
+PARITY_CASES = [("default", [], "default"),
+                ("compact", ["--format", "compact"], "default"),
+                ("records", ["--format", "records"], "default"),
+                ("msgpack", ["--format", "msgpack"], "default"),
+                ("shared-templates", ["--shared-templates"], "default"),
+                ("workers", ["--workers", "2"], "default"),
+                ("numpy", ["--numpy"], "default"),
+                ("prune-dominated", ["--prune-dominated"], "prune-dominated"),
+                ("generator-candidates", ["--generator-candidates"], "generator-candidates"),
+                ("sweep", ["--sweep"], "sweep"),
+                ("sweep-numpy", ["--sweep", "--numpy"], "sweep"),
+                ("booster-tables", ["--booster-tables"], "booster-tables"),
+                ("booster-tables-numpy", ["--booster-tables", "--numpy"], "booster-tables"),
+                ("columns", ["--columns"], "columns"),
+                ("shard-ship-class", ["--shard-by", "ship-class"], "shard-ship-class"),
+                ("shard-generator-class", ["--shard-by", "generator-class"], "shard-generator-class")]
+
+
+def golden_filename(name: str) -> str:
+    return os.path.join(GOLDEN, "{}.json.gz".format(name))
+
+
+def run_build(root: str, output: str, options: list):
+    """
+    Build in a new process without any cache. Files written to their default path, e.g. by --booster-tables, end up next to output.
+    :return: seconds and peak resident memory in KiB of the build
+    """
+    with tempfile.TemporaryDirectory() as work, tempfile.TemporaryFile() as errors:
+        command = [sys.executable, SCRIPT, "--root", root, "--output", output, "--cache", os.path.join(work, "cache.json"),
+                   "--no-source-cache"] + options
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=os.path.dirname(output), stdout=subprocess.DEVNULL, stderr=errors)
+        _, status, usage = os.wait4(process.pid, 0)  # the usage of this process only, unlike resource.RUSAGE_CHILDREN
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            errors.seek(0)
+            raise RuntimeError("{} failed:\n{}".format(" ".join(command), errors.read().decode("utf-8", "replace")))
+    return elapsed, usage.ru_maxrss
+
+
+def read_booster_tables(filename: str, index: Dict) -> List[Dict]:
+    """
+    Summarise the tables of a --booster-tables file, the whole file would make a large golden file.
+    :param index: the shield_booster_tables section of the data file
+    :return: per table the number of rows, the digest of the variant indices and the minimum, maximum and sum of every stat
+    """
+    with open(filename, "rb") as tables_file:
+        content = tables_file.read()
+    tables = list()
+    for table in index["tables"]:
+        stats_count = len(index["stats"])
+        stats = struct.unpack_from("<{}f".format(table["rows"] * stats_count), content, table["stats_offset"])
+        variants = content[table["variants_offset"]:table["variants_offset"] + table["rows"] * table["boosters"] * 2]
+        columns = dict((name, stats[i::stats_count]) for i, name in enumerate(index["stats"]))
+        tables.append({"boosters": table["boosters"],
+                       "rows": table["rows"],
+                       "variants_sha1": hashlib.sha1(variants).hexdigest(),
+                       "stats": dict((name, {"min": min(column), "max": max(column), "sum": sum(column)}) for name, column in columns.items())})
+    return tables
+
+
+def load_outputs(directory: str) -> Dict:
+    """
+    :return: every file written by a build by file name. Data files as loaded by load_data_file, booster tables as summarised by
+             read_booster_tables and columns as read back by map_columns.
+    """
+    outputs = dict()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".bin"):
+            continue  # read with the index of the data file referring to them
+        data = cdf.load_data_file(os.path.join(directory, name), resolve_templates=True)
+        outputs[name] = data
+        if "shield_booster_tables" in data:
+            index = data["shield_booster_tables"]
+            outputs[index["file"]] = read_booster_tables(os.path.join(directory, index["file"]), index)
+        if "columns" in data:
+            columns = cdf.map_columns(os.path.join(directory, data["columns"]["file"]))
+            outputs[data["columns"]["file"]] = dict((table, dict((column, list(values)) for column, values in table_columns.items()))
+                                                    for table, table_columns in columns.items())
+    return outputs
+
+
+def compare(expected, actual, tolerance: float, path: str = "$") -> list:
+    """
+    :return: description of every difference between expected and actual
+    """
+    number = (int, float)
+    if isinstance(expected, number) and isinstance(actual, number) and not isinstance(expected, bool) and not isinstance(actual, bool):
+        if abs(expected - actual) > tolerance * max(1, abs(expected)):
+            return ["{}: expected {}, got {}".format(path, expected, actual)]
+        return list()
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = ["{}: missing {}".format(path, key) for key in expected if key not in actual]
+        differences += ["{}: unexpected {}".format(path, key) for key in actual if key not in expected]
+        for key in expected:
+            if key in actual:
+                differences += compare(expected[key], actual[key], tolerance, "{}.{}".format(path, key))
+        return differences
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return ["{}: expected {} items, got {}".format(path, len(expected), len(actual))]
+        differences = list()
+        for i, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            differences += compare(expected_item, actual_item, tolerance, "{}[{}]".format(path, i))
+        return differences
+    if expected != actual:
+        return ["{}: expected {!r}, got {!r}".format(path, expected, actual)]
+    return list()
+
+
+def run_parity(tolerance: float, update_golden: bool) -> int:
+    """
+    :return: number of builds that differ from their golden file
+    """
+    failures = 0
+    with tempfile.TemporaryDirectory() as work:
+        for name, options, golden in PARITY_CASES:
+            if "--numpy" in options and cdf.numpy is None:
+                print("{:<22} skipped, numpy is not installed".format(name))
+                continue
+            if "msgpack" in options and cdf.msgpack is None:
+                print("{:<22} skipped, msgpack is not installed".format(name))
+                continue
+            # every build writes into a directory of its own, the file names are the same for builds sharing a golden file
+            directory = os.path.join(work, name)
+            os.makedirs(directory)
+            elapsed, _ = run_build(FIXTURES, os.path.join(directory, "data.json"), options)
+            data = load_outputs(directory)
+            if update_golden and name == golden:
+                os.makedirs(GOLDEN, exist_ok=True)
+                # without a modification time in the header an unchanged golden file stays the same
+                with gzip.GzipFile(golden_filename(golden), "wb", mtime=0) as golden_file:
+                    golden_file.write(json.dumps(data, indent="  ", sort_keys=True).encode("utf-8"))
+                print("{:<22} golden file written".format(name))
+                continue
+
+            with gzip.open(golden_filename(golden), "rt", encoding="utf-8") as golden_file:
+                differences = compare(json.load(golden_file), data, tolerance)
+            print("{:<22} {:>7.3f}s {}".format(name, elapsed, "ok" if not differences else "{} differences".format(len(differences))))
+            for difference in differences[:10]:
+                print("    " + difference)
+            failures += 1 if differences else 0
+    return failures
+
+
+def run_throughput(scales: list, options: list):
+    print("{:>6} {:>7} {:>10} {:>10} {:>10}".format("scale", "ships", "time", "peak", "output"))
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as root:
+            synthetic.write_tree(root, ship_count=SHIP_COUNT * scale, module_scale=scale)
+            output = os.path.join(root, "data.json")
+            elapsed, peak = run_build(root, output, options)
+            size = os.path.getsize(output)
+        print("{:>6} {:>7} {:>9.3f}s {:>8.1f}M {:>8.2f}M".format(scale, SHIP_COUNT * scale, elapsed, peak / 1024, size / 1024 ** 2))
+
+
+def update_fixtures(source_root: str, ships: int):
+    """
+    Copy ships spread over all ship files, the module files and the shield engineering of a checkout into the fixtures.
+    """
+    source, fixture = cdf.SourceRoot(os.path.abspath(source_root)), cdf.SourceRoot(FIXTURES)
+    shutil.rmtree(FIXTURES, ignore_errors=True)
+    ship_files = cdf.find_ship_files(source.ships)
+    files = [(x, os.path.join(fixture.ships, os.path.relpath(x, source.ships))) for x in ship_files[::max(1, len(ship_files) // ships)][:ships]]
+    files += [(os.path.join(source.modules_standard, x), os.path.join(fixture.modules_standard, x)) for x in cdf.MODULES_STANDARD_FILE_NAMES.values()]
+    files += [(source.shield_generators[x], fixture.shield_generators[x]) for x in source.shield_generators]
+    files += [(source.shipyard, fixture.shipyard), (source.shield_booster, fixture.shield_booster)]
+    for source_file, fixture_file in files:
+        os.makedirs(os.path.dirname(fixture_file), exist_ok=True)
+        shutil.copyfile(source_file, fixture_file)
+
+    # only the shield engineering of the large engineering files
+    blueprints = cdf.MODULE_SHIELD_BOOSTER_ENGINEERING_BLUEPRINTS | cdf.MODULE_SHIELD_GENERATOR_ENGINEERING_BLUEPRINTS
+    specials = cdf.MODULE_SHIELD_BOOSTER_ENGINEERING_SPECIALS | cdf.MODULE_SHIELD_GENERATOR_ENGINEERING_SPECIALS
+    for source_file, fixture_file, symbols in ((source.engineering_blueprints, fixture.engineering_blueprints, blueprints),
+                                               (source.engineering_specials, fixture.engineering_specials, specials),
+                                               (source.engineering_special_actions, fixture.engineering_special_actions, specials)):
+        with open(source_file) as json_file:
+            content = json.load(json_file)
+        os.makedirs(os.path.dirname(fixture_file), exist_ok=True)
+        with open(fixture_file, "w") as json_file:
+            json.dump(dict((k, v) for k, v in content.items() if k in symbols), json_file, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare create_data_file.py with golden files and measure its throughput.")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="allowed difference of numbers (default: %(default)s)")
+    parser.add_argument("--scales", type=int, nargs="*", default=[1, 10, 100],
+                        help="sizes of the synthetic catalogs as multiples of the current one, none skips the throughput (default: %(default)s)")
+    parser.add_argument("--options", default="", help="options of the throughput builds, e.g. \"--sweep --workers 4\"")
+    parser.add_argument("--update-golden", action="store_true", help="write the output of the parity builds as new golden files")
+    parser.add_argument("--update-fixtures", default=None, metavar="SOURCE_ROOT",
+                        help="copy the fixtures from a directory containing coriolis-data and FDevIDs, then write new golden files")
+    parser.add_argument("--fixture-ships", type=int, default=8, help="ships copied by --update-fixtures (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.update_fixtures:
+        update_fixtures(args.update_fixtures, args.fixture_ships)
+        args.update_golden = True
+    failures = run_parity(args.tolerance, args.update_golden)
+    if args.scales:
+        run_throughput(args.scales, args.options.split())
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
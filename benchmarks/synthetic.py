@@ -0,0 +1,157 @@
+"""
+Generate a synthetic coriolis-data / FDevIDs source tree with the same layout and field names as the real submodules.
+"""
+from __future__ import annotations
+import os
+import csv
+import json
+import random
+import argparse
+from typing import Dict, List
+
+RATINGS = ["E", "D", "C", "B", "A"]
+STANDARD_GROUPS = {"power_plant.json": ("pp", "Int_Powerplant_Size{}_Class{}"),
+                   "thrusters.json": ("t", "Int_Engine_Size{}_Class{}"),
+                   "frame_shift_drive.json": ("fsd", "Int_Hyperdrive_Size{}_Class{}"),
+                   "life_support.json": ("ls", "Int_LifeSupport_Size{}_Class{}"),
+                   "power_distributor.json": ("pd", "Int_PowerDistributor_Size{}_Class{}"),
+                   "sensors.json": ("s", "Int_Sensors_Size{}_Class{}"),
+                   "fuel_tank.json": ("ft", "Int_FuelTank_Size{}_Class{}")}
+
+SHIELD_BOOSTER_BLUEPRINTS = {"ShieldBooster_HeavyDuty": ("Heavy Duty", {"integrity": 0.15, "mass": 0.1, "power": 0.1, "shieldboost": 0.24}),
+                             "ShieldBooster_Kinetic": ("Kinetic Resistant", {"integrity": 0.1, "kinres": 0.12, "shieldboost": -0.02}),
+                             "ShieldBooster_Thermic": ("Thermal Resistant", {"integrity": 0.1, "thermres": 0.12, "shieldboost": -0.02}),
+                             "ShieldBooster_Explosive": ("Blast Resistant", {"integrity": 0.1, "explres": 0.12, "shieldboost": -0.02}),
+                             "ShieldBooster_Resistive": ("Resistance Augmented", {"integrity": 0.1, "power": 0.1, "explres": 0.05,
+                                                                                  "kinres": 0.05, "thermres": 0.05, "shieldboost": -0.02})}
+SHIELD_GENERATOR_BLUEPRINTS = {"ShieldGenerator_Kinetic": ("Kinetic Resistant", {"kinres": 0.3, "thermres": -0.1, "explres": -0.05}),
+                               "ShieldGenerator_Reinforced": ("Reinforced", {"optmul": 0.3, "kinres": 0.05, "thermres": 0.05, "explres": 0.05}),
+                               "ShieldGenerator_Thermic": ("Thermal Resistant", {"thermres": 0.3, "kinres": -0.1, "explres": -0.05})}
+SPECIALS = {"special_shieldbooster_thermic": ("Thermo Block", {"thermres": 2, "explres": -1, "kinres": -1}),
+            "special_shieldbooster_kinetic": ("Force Block", {"kinres": 2, "explres": -1, "thermres": -1}),
+            "special_shieldbooster_explosive": ("Blast Block", {"explres": 2, "kinres": -1, "thermres": -1}),
+            "special_shieldbooster_chunky": ("Super Capacitors", {"integrity": 0.1, "mass": 0.3, "shieldboost": 0.05,
+                                                                 "explres": -1, "kinres": -1, "thermres": -1}),
+            "special_shield_regenerative": ("Fast Charge", {"regen": 0.15, "optmul": -0.02}),
+            "special_shield_resistive": ("Multi-weave", {"explres": 1.5, "kinres": 1.5, "thermres": 1.5}),
+            "special_shield_health": ("Hi-Cap", {"optmul": 0.06, "power": 0.1}),
+            "special_shield_thermic": ("Thermo Block", {"thermres": 8, "kinres": -1.5}),
+            "special_shield_kinetic": ("Force Block", {"kinres": 8, "thermres": -1.5})}
+
+
+def _write_json(path: str, content) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as json_file:
+        json.dump(content, json_file, indent=2)
+
+
+def _grades(features: Dict[str, float]) -> Dict[str, Dict]:
+    grades = dict()
+    for grade in range(1, 6):
+        grade_features = dict()
+        for k, v in features.items():
+            grade_features[k] = [round(v * (grade - 1) / 5, 4), round(v * grade / 5, 4)]
+        grades[str(grade)] = {"features": grade_features, "engineers": [], "components": {}}
+    return grades
+
+
+def _shield_generator(size: int, rating: str, symbol: str, name: str, scale: float) -> Dict:
+    grade = RATINGS.index(rating)
+    return {"class": size, "rating": rating, "symbol": symbol, "ukName": name, "grp": "sg",
+            "integrity": 40 + 10 * size + 5 * grade, "power": round(0.6 + 0.3 * size, 2),
+            "explres": 0.5, "kinres": 0.4, "thermres": -0.2,
+            "regen": round(1 + 0.2 * size, 2), "brokenregen": round(1.6 + 0.3 * size, 2), "distdraw": round(0.6 + 0.2 * size, 2),
+            "minmass": 13 * size, "optmass": 25 * size * size, "maxmass": 63 * size * size,
+            "minmul": round(0.3 * scale, 4), "optmul": round((0.8 + 0.05 * grade) * scale, 4), "maxmul": round((1.3 + 0.05 * grade) * scale, 4)}
+
+
+def write_tree(root: str, ship_count: int = 38, module_scale: int = 1, seed: int = 1) -> List[str]:
+    """
+    Write a synthetic source tree below root.
+    :param root: directory that will contain coriolis-data and FDevIDs
+    :param ship_count: number of ship files to generate
+    :param module_scale: multiplies the number of classes in every standard module file
+    :param seed: seed for the random number generator
+    :return: list of written ship file paths
+    """
+    rng = random.Random(seed)
+    coriolis = os.path.join(root, "coriolis-data")
+    max_class = 8 * module_scale
+
+    for file_name, (group, symbol_format) in STANDARD_GROUPS.items():
+        modules = list()
+        for size in range(1, max_class + 1):
+            for grade, rating in enumerate(RATINGS):
+                modules.append({"class": size, "rating": rating, "grp": group, "mass": size * 2.5,
+                                "symbol": symbol_format.format(size, grade + 1)})
+        _write_json(os.path.join(coriolis, "modules", "standard", file_name), {group: modules})
+
+    normal, prismatic, biweave = list(), list(), list()
+    for size in range(1, 9):
+        for grade, rating in enumerate(RATINGS):
+            normal.append(_shield_generator(size, rating, "Int_ShieldGenerator_Size{}_Class{}".format(size, grade + 1), "Shield Generator", 1.0))
+        prismatic.append(_shield_generator(size, "A", "Int_ShieldGenerator_Size{}_Class5_Strong".format(size), "Prismatic Shield", 1.2))
+        biweave.append(_shield_generator(size, "C", "Int_ShieldGenerator_Size{}_Class3_Fast".format(size), "Bi-Weave Shield", 0.9))
+    internal = os.path.join(coriolis, "modules", "internal")
+    _write_json(os.path.join(internal, "shield_generator.json"), {"sg": normal})
+    _write_json(os.path.join(internal, "pristmatic_shield_generator.json"), {"psg": prismatic})
+    _write_json(os.path.join(internal, "bi_weave_shield_generator.json"), {"bsg": biweave})
+
+    boosters = list()
+    for grade, rating in enumerate(RATINGS):
+        boosters.append({"class": 0, "rating": rating, "symbol": "Hpt_ShieldBooster_Size0_Class{}".format(grade + 1), "grp": "sb",
+                         "integrity": 25 + 5 * grade, "mass": [0.5, 1, 2, 3, 3.5][grade], "power": [0.2, 0.5, 0.7, 1, 1.2][grade],
+                         "shieldboost": [0.04, 0.08, 0.12, 0.16, 0.2][grade], "explres": 0, "kinres": 0, "thermres": 0})
+    _write_json(os.path.join(coriolis, "modules", "hardpoints", "shield_booster.json"), {"sb": boosters})
+
+    blueprints = dict()
+    for symbol, (name, features) in list(SHIELD_BOOSTER_BLUEPRINTS.items()) + list(SHIELD_GENERATOR_BLUEPRINTS.items()):
+        blueprints[symbol] = {"fdname": symbol, "name": name, "grades": _grades(features)}
+    _write_json(os.path.join(coriolis, "modifications", "blueprints.json"), blueprints)
+    _write_json(os.path.join(coriolis, "modifications", "specials.json"),
+                dict((symbol, {"name": name, "edname": symbol}) for symbol, (name, _) in SPECIALS.items()))
+    _write_json(os.path.join(coriolis, "modifications", "modifierActions.json"),
+                dict((symbol, actions) for symbol, (_, actions) in SPECIALS.items()))
+
+    ship_files = list()
+    shipyard_rows = list()
+    for i in range(ship_count):
+        ship_class = 1 + i % 3
+        name = "Synthetic Ship {}".format(i)
+        symbol = "Synthetic_{}".format(i)
+        highest_internal = min(8, ship_class * 2 + rng.randint(0, 2))
+        internal_slots = sorted([rng.randint(1, highest_internal) for _ in range(4 + ship_class * 2)], reverse=True)
+        internal_slots[0] = highest_internal
+        if ship_class == 3:
+            internal_slots.append({"class": 5, "name": "Military"})
+        hardpoints = [rng.randint(1, ship_class + 1) for _ in range(2 + ship_class)] + [0] * rng.randint(2, 8)
+        standard = [min(8, ship_class * 2 + rng.randint(0, 2)) for _ in range(7)]
+        defaults = ["{}{}".format(size, rng.choice("EDCBA")) for size in standard]
+        ship = {"properties": {"name": name, "class": ship_class, "manufacturer": "Synthetic",
+                               "baseShieldStrength": 40 + 40 * ship_class + rng.randint(0, 120),
+                               "hullMass": 20 * ship_class * ship_class + rng.randint(0, 400 * (ship_class - 1) + 30)},
+                "slots": {"standard": standard, "hardpoints": hardpoints, "internal": internal_slots},
+                "defaults": {"standard": defaults}}
+        ship_file = os.path.join(coriolis, "ships", "synthetic_{}.json".format(i))
+        _write_json(ship_file, {"synthetic_{}".format(i): ship})
+        ship_files.append(ship_file)
+        shipyard_rows.append({"id": 128049000 + i, "symbol": symbol, "name": name})
+
+    shipyard = os.path.join(root, "FDevIDs", "shipyard.csv")
+    os.makedirs(os.path.dirname(shipyard), exist_ok=True)
+    with open(shipyard, "w", newline="") as shipyard_file:
+        writer = csv.DictWriter(shipyard_file, fieldnames=["id", "symbol", "name"])
+        writer.writeheader()
+        writer.writerows(shipyard_rows)
+
+    return ship_files
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic coriolis-data / FDevIDs source tree.")
+    parser.add_argument("root", help="output directory")
+    parser.add_argument("--ships", type=int, default=38, help="number of ship files")
+    parser.add_argument("--module-scale", type=int, default=1, help="multiplier for the size of standard module catalogs")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    write_tree(args.root, args.ships, args.module_scale, args.seed)
@@ -1,9 +1,40 @@
 from __future__ import annotations
 import os
-import copy
 import json
+import math
 import csv
-from typing import List, Dict, Tuple, Optional
+import hashlib
+import re
+import shutil
+import subprocess
+import http.server
+import socketserver
+import threading
+import signal
+import urllib.parse
+import io
+import marshal
+import mmap
+import tempfile
+import argparse
+import array
+import struct
+import sys
+import concurrent.futures
+import multiprocessing
+import contextlib
+import time
+import tracemalloc
+from typing import List, Dict, Tuple, Optional, Callable
+
+try:
+    import numpy
+except ImportError:  # numpy is optional and only needed for --numpy
+    numpy = None
+try:
+    import msgpack
+except ImportError:  # msgpack is optional and only needed for --format msgpack
+    msgpack = None
 
 
 PATH_TO_SHIPS = os.path.join(os.getcwd(), "coriolis-data", "ships")
@@ -18,6 +49,13 @@ PATH_TO_ENGINEERING_BLUEPRINTS = os.path.join(os.getcwd(), "coriolis-data", "mod
 
 PATH_TO_SHIELD_BOOSTER_ENGINEERING_SPECIALS = os.path.join(os.getcwd(), "coriolis-data", "modifications", "specials.json")
 PATH_TO_SHIELD_BOOSTER_ENGINEERING_SPECIAL_ACTIONS = os.path.join(os.getcwd(), "coriolis-data", "modifications", "modifierActions.json")
+
+PATH_TO_OUTPUT = os.path.join(os.getcwd(), "data.json")
+PATH_TO_SHIELD_BOOSTER_TABLES = os.path.join(os.getcwd(), "shield_booster_tables.bin")
+PATH_TO_COLUMNS = os.path.join(os.getcwd(), "data_columns.bin")
+PATH_TO_BUILD_CACHE = os.path.join(os.getcwd(), ".data_cache.json")
+PATH_TO_SOURCE_CACHE = os.path.join(os.getcwd(), ".source_cache")
+
 MODULE_SHIELD_GENERATOR_ENGINEERING_SPECIALS = {"special_shield_regenerative",
                                                 "special_shield_resistive",
                                                 "special_shield_health",
@@ -36,6 +74,41 @@ MODULE_SHIELD_BOOSTER_ENGINEERING_SPECIALS = {"special_shieldbooster_thermic",
                                               "special_shieldbooster_explosive",
                                               "special_shieldbooster_chunky"}
 
+# --columns: numeric fields written as columns, strings stay in data.json
+COLUMNS_MAGIC = b"STDC"
+COLUMNS_ALIGNMENT = 64
+SHIELD_BOOSTER_COLUMNS = ["shield_strength_bonus", "exp_res_bonus", "kin_res_bonus", "therm_res_bonus"]
+SHIELD_GENERATOR_COLUMNS = ["class", "explres", "kinres", "thermres", "minmass", "optmass", "maxmass", "minmul", "optmul", "maxmul"]
+
+# damage taken below this fraction is only reduced by half of the remaining resistance
+DIMINISHING_RETURNS_THRESHOLD = 0.7
+SHIELD_BOOSTER_TABLE_STATS = ["shield_strength_multiplier", "exp_res", "kin_res", "therm_res"]
+
+# resistance of a shield booster data entry per damage type
+DAMAGE_TYPE_RESISTANCES = {"explosive": "exp_res_bonus",
+                           "kinetic": "kin_res_bonus",
+                           "thermal": "therm_res_bonus"}
+
+DATA_FORMATS = ("json", "compact", "records", "msgpack")
+RECORDS_MAGIC = b"STDR"
+RECORDS_CODECS = ("json", "msgpack")
+RECORD_LIST = 1  # start of a list section, items follow
+RECORD_ITEM = 2  # item of the current list section
+RECORD_VALUE = 3  # complete value of a section
+
+# blueprint grades and rolls (0: worst, 1: best value of a grade) of --sweep
+SWEEP_GRADES = [1, 2, 3, 4, 5]
+SWEEP_ROLLS = {"min": 0, "mid": 0.5, "max": 1}
+SHARED_TEMPLATE_REFERENCE = "$ref"
+
+# --snapshots: prefix of git revisions and the submodules checked out for them
+SNAPSHOT_GIT_PREFIX = "git:"
+SNAPSHOT_SUBMODULES = ("coriolis-data", "FDevIDs")
+
+# --serve: default address and prefix of unix socket addresses
+SERVICE_ADDRESS = "127.0.0.1:8000"
+SERVICE_UNIX_PREFIX = "unix:"
+
 MODULE_NAME_POWER_PLANT = "power plant"
 MODULE_NAME_THRUSTERS = "thrusters"
 MODULE_NAME_FSD = "fsd"
@@ -60,8 +133,97 @@ class Utilities:
                 "On": True,
                 "Priority": 0}
 
+    @staticmethod
+    def file_digest(*filenames: str) -> str:
+        """
+        Hash the content of one or more files.
+        :param filenames: paths of the files, the order matters
+        :return: hex digest
+        """
+        digest = hashlib.sha1()
+        for filename in filenames:
+            with open(filename, "rb") as file:
+                digest.update(file.read())
+        return digest.hexdigest()
+
+    @staticmethod
+    def json_digest(*json_objects: json) -> str:
+        """
+        Hash json objects independent of their key order.
+        :param json_objects: objects that can be serialised to json
+        :return: hex digest
+        """
+        return hashlib.sha1(json.dumps(json_objects, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def roll_feature(values: List[float], roll: float) -> float:
+        """
+        :param values: worst and best value of a blueprint feature, e.g. [0.1, 0.2]
+        :param roll: quality of the roll, 0 is the worst and 1 the best value
+        :return: value of the feature
+        """
+        if roll == 1:
+            return values[1]
+        if roll == 0:
+            return values[0]
+        return values[0] + (values[1] - values[0]) * roll
+
+
+class SlotLayout:
+    """
+    Slots of a ship as compact arrays of sizes instead of the nested lists of coriolis-data.
+    Slots that are not a plain size, e.g. {"class": 5, "name": "Military"}, are kept as they are.
+    """
+    __slots__ = ("groups", "counts", "sizes", "special")
+    _groups = dict()  # equal group names are shared by all layouts
+
+    def __init__(self):
+        self.groups = ()  # names of the slot groups, e.g. ("standard", "hardpoints", "internal")
+        self.counts = array.array("H")  # number of slots per group
+        self.sizes = array.array("B")  # size of every slot, group after group
+        self.special = None  # index in sizes -> slot that is not a plain size, None if there are none
+
+    @staticmethod
+    def from_json(json_slots: json) -> SlotLayout:
+        """
+        :param json_slots: slots of a coriolis ship, e.g. {"standard": [3, 3, 3, 2, 3, 3, 3], "hardpoints": [2, 0], "internal": [3]}
+        :return: the layout
+        """
+        layout = SlotLayout()
+        groups = tuple(json_slots)
+        layout.groups = SlotLayout._groups.setdefault(groups, groups)
+        for group in groups:
+            layout.counts.append(len(json_slots[group]))
+            for slot in json_slots[group]:
+                if type(slot) is not int or not 0 <= slot <= 255:
+                    if layout.special is None:
+                        layout.special = dict()
+                    layout.special[len(layout.sizes)] = slot
+                    slot = 0
+                layout.sizes.append(slot)
+        return layout
+
+    def to_json(self) -> Dict[str, List]:
+        """
+        :return: the slots in the format of coriolis-data
+        """
+        json_slots = dict()
+        start = 0
+        for group, count in zip(self.groups, self.counts):
+            slots = self.sizes[start:start + count].tolist()
+            if self.special is not None:
+                for i in range(count):
+                    if start + i in self.special:
+                        slots[i] = self.special[start + i]
+            json_slots[group] = slots
+            start += count
+        return json_slots
+
 
 class Ship:
+    __slots__ = ("name", "symbol", "highest_internal", "utility_slots_amount", "armour", "power_plant", "thrusters", "frame_shift_drive",
+                 "life_support", "power_distributor", "sensors", "fuel_tank", "base_shield_strength", "hull_mass", "slots", "ship_class")
+
     def __init__(self):
         self.name = ""
         self.symbol = ""
@@ -77,7 +239,17 @@ class Ship:
         self.fuel_tank = ""
         self.base_shield_strength = 0
         self.hull_mass = 0
-        self.slots = ""
+        self.slots = SlotLayout()
+        self.ship_class = 0  # 1: small, 2: medium, 3: large
+
+    def clone(self) -> Ship:
+        """
+        :return: a copy of the ship sharing its slot layout
+        """
+        ship = Ship.__new__(Ship)
+        for attribute in Ship.__slots__:
+            setattr(ship, attribute, getattr(self, attribute))
+        return ship
 
     def generate_data_entry(self):
         modules = list()
@@ -100,7 +272,8 @@ class Ship:
                 "hullMass": self.hull_mass,
                 "utility_slots": self.utility_slots_amount,
                 "highest_internal": self.highest_internal,
-                "slot_layout": self.slots}
+                "slot_layout": self.slots.to_json(),
+                "ship_class": self.ship_class}
 
     @staticmethod
     def _extract_class_and_grade(s: str) -> Optional[Tuple[int, str]]:
@@ -110,22 +283,36 @@ class Ship:
             return int(s[0]), s[1]
 
     @staticmethod
-    def _search_standard_module(standard_modules: json, standard_string: str) -> Optional[str]:
+    def index_standard_modules(standard_modules: json) -> Dict[Tuple[int, str], str]:
+        """
+        Index a file of coriolis-data/modules/standard by class and rating.
+        :param standard_modules: json object of the file, e.g. power_plant.json
+        :return: Dictionary containing (class, rating) as key and the symbol of the module as value
+        """
         standard_modules = next(iter(standard_modules.values()))  # only 1 object containing a list per file
-        module_class, module_grade = Ship._extract_class_and_grade(standard_string)
+        index = dict()
         for standard_module in standard_modules:
-            if standard_module["class"] == module_class and standard_module["rating"] == module_grade:
-                return standard_module["symbol"]
-        return None
+            index.setdefault((standard_module["class"], standard_module["rating"]), standard_module["symbol"])  # first match wins
+        return index
 
     @staticmethod
-    def create_from_json(json_ships: json, standard_modules: Dict[str, json], ship_name_to_symbol: Dict[str, str]) -> Ship:
+    def _search_standard_module(standard_modules: Dict[Tuple[int, str], str], standard_string: str, module_name: str, ship_name: str) -> str:
+        class_and_grade = Ship._extract_class_and_grade(standard_string)
+        if class_and_grade is None:
+            raise ValueError("{}: can't read class and rating of the default {} from '{}'".format(ship_name, module_name, standard_string))
+        if class_and_grade not in standard_modules:
+            raise ValueError("{}: there is no {} with class {} and rating {}".format(ship_name, module_name, *class_and_grade))
+        return standard_modules[class_and_grade]
+
+    @staticmethod
+    def create_from_json(json_ships: json, standard_modules: Dict[str, Dict[Tuple[int, str], str]], ship_name_to_symbol: Dict[str, str]) -> Ship:
         """
         Create a ship object from coriolis data
         :param json_ships: The json object of the file, e.g. adder.json
-        :param standard_modules: Default fitted modules as defined in coriolis-data/modules/standard/*
+        :param standard_modules: Default fitted modules as defined in coriolis-data/modules/standard/*, indexed by index_standard_modules
         :param ship_name_to_symbol: Dictionary containing the ship name as key and the internal identifier (symbol) as value
         :return: a Ship
+        :raises ValueError: if a default standard module doesn't exist
         """
         json_ship = next(iter(json_ships.values()))  # only 1 ship per file
         ship = Ship()
@@ -133,18 +320,20 @@ class Ship:
         ship.symbol = ship_name_to_symbol.get(json_ship["properties"]["name"].lower(), json_ship["properties"]["name"])  # avoid None
         ship.base_shield_strength = json_ship["properties"]["baseShieldStrength"]
         ship.hull_mass = json_ship["properties"]["hullMass"]
+        ship.ship_class = json_ship["properties"].get("class", 0)
 
         standards = json_ship["defaults"]["standard"]
-        ship.power_plant = Ship._search_standard_module(standard_modules.get(MODULE_NAME_POWER_PLANT), standards[0])
-        ship.thrusters = Ship._search_standard_module(standard_modules.get(MODULE_NAME_THRUSTERS), standards[1])
-        ship.frame_shift_drive = Ship._search_standard_module(standard_modules.get(MODULE_NAME_FSD), standards[2])
-        ship.life_support = Ship._search_standard_module(standard_modules.get(MODULE_NAME_LIFE_SUPPORT), standards[3])
-        ship.power_distributor = Ship._search_standard_module(standard_modules.get(MODULE_NAME_POWER_DISTRIBUTOR), standards[4])
-        ship.sensors = Ship._search_standard_module(standard_modules.get(MODULE_NAME_SENSORS), standards[5])
-        ship.fuel_tank = Ship._search_standard_module(standard_modules.get(MODULE_NAME_FUEL_TANK), standards[6])
+        ship.power_plant = Ship._search_standard_module(standard_modules[MODULE_NAME_POWER_PLANT], standards[0], MODULE_NAME_POWER_PLANT, ship.name)
+        ship.thrusters = Ship._search_standard_module(standard_modules[MODULE_NAME_THRUSTERS], standards[1], MODULE_NAME_THRUSTERS, ship.name)
+        ship.frame_shift_drive = Ship._search_standard_module(standard_modules[MODULE_NAME_FSD], standards[2], MODULE_NAME_FSD, ship.name)
+        ship.life_support = Ship._search_standard_module(standard_modules[MODULE_NAME_LIFE_SUPPORT], standards[3], MODULE_NAME_LIFE_SUPPORT, ship.name)
+        ship.power_distributor = Ship._search_standard_module(standard_modules[MODULE_NAME_POWER_DISTRIBUTOR], standards[4],
+                                                              MODULE_NAME_POWER_DISTRIBUTOR, ship.name)
+        ship.sensors = Ship._search_standard_module(standard_modules[MODULE_NAME_SENSORS], standards[5], MODULE_NAME_SENSORS, ship.name)
+        ship.fuel_tank = Ship._search_standard_module(standard_modules[MODULE_NAME_FUEL_TANK], standards[6], MODULE_NAME_FUEL_TANK, ship.name)
         ship.armour = "{}_armour_grade1".format(ship.symbol)
 
-        ship.slots = json_ship["slots"]
+        ship.slots = SlotLayout.from_json(json_ship["slots"])
         ship.highest_internal = json_ship["slots"]["internal"][0]
         for hardpoint in json_ship["slots"]["hardpoints"]:
             if hardpoint == 0:
@@ -154,6 +343,9 @@ class Ship:
 
 
 class ShieldBooster:
+    __slots__ = ("symbol", "engineering_name", "engineering_symbol", "experimental_name", "experimental_symbol", "integrity", "power_draw",
+                 "explres", "kinres", "thermres", "mass", "shield_boost", "grade", "roll")
+
     def __init__(self):
         self.symbol = ""
         self.engineering_name = ""
@@ -167,26 +359,44 @@ class ShieldBooster:
         self.thermres = 0
         self.mass = 0
         self.shield_boost = 0
+        self.grade = 5
+        self.roll = 1
+
+    def clone(self) -> ShieldBooster:
+        """
+        :return: a copy of the booster, all attributes are immutable values
+        """
+        booster = ShieldBooster.__new__(ShieldBooster)
+        for attribute in ShieldBooster.__slots__:
+            setattr(booster, attribute, getattr(self, attribute))
+        return booster
 
-    def apply_engineered(self, blueprint: json):
+    def apply_engineered(self, blueprint: json, grade: int = 5, roll: float = 1):
+        """
+        :param blueprint: The engineering blueprint
+        :param grade: grade of the blueprint
+        :param roll: quality of the roll, 0 is the worst and 1 the best value of the grade
+        """
         self.engineering_name = blueprint["name"]
         self.engineering_symbol = blueprint["fdname"]
-        grade_5_features = blueprint["grades"]["5"]["features"]
-
-        if "integrity" in grade_5_features:
-            self.integrity = self.integrity * (1 + grade_5_features["integrity"][1])
-        if "power" in grade_5_features:
-            self.power_draw = self.power_draw * (1 + grade_5_features["power"][1])
-        if "mass" in grade_5_features:
-            self.mass = self.mass * (1 + grade_5_features["mass"][1])
-        if "shieldboost" in grade_5_features:
-            self.shield_boost = (1 + self.shield_boost) * (1 + grade_5_features["shieldboost"][1]) - 1
-        if "explres" in grade_5_features:
-            self.explres = (1 + self.explres) * (1 + grade_5_features["explres"][1]) - 1
-        if "kinres" in grade_5_features:
-            self.kinres = (1 + self.kinres) * (1 + grade_5_features["kinres"][1]) - 1
-        if "thermres" in grade_5_features:
-            self.thermres = (1 + self.thermres) * (1 + grade_5_features["thermres"][1]) - 1
+        self.grade = grade
+        self.roll = roll
+        features = dict((k, Utilities.roll_feature(v, roll)) for k, v in blueprint["grades"][str(grade)]["features"].items())
+
+        if "integrity" in features:
+            self.integrity = self.integrity * (1 + features["integrity"])
+        if "power" in features:
+            self.power_draw = self.power_draw * (1 + features["power"])
+        if "mass" in features:
+            self.mass = self.mass * (1 + features["mass"])
+        if "shieldboost" in features:
+            self.shield_boost = (1 + self.shield_boost) * (1 + features["shieldboost"]) - 1
+        if "explres" in features:
+            self.explres = (1 + self.explres) * (1 + features["explres"]) - 1
+        if "kinres" in features:
+            self.kinres = (1 + self.kinres) * (1 + features["kinres"]) - 1
+        if "thermres" in features:
+            self.thermres = (1 + self.thermres) * (1 + features["thermres"]) - 1
 
     def apply_experimental(self, experimental_symbol: str, specials: json, modifier_actions: json):
         self.experimental_name = specials[experimental_symbol]["name"]
@@ -253,8 +463,8 @@ class ShieldBooster:
 
         loadout_template = Utilities.generate_module_attributes(self.symbol, "")  # slot is determined at runtime in shield tester
         loadout_template.setdefault("Engineering", {"BlueprintName": self.engineering_symbol,
-                                                    "Level": 5,
-                                                    "Quality": 1,
+                                                    "Level": self.grade,
+                                                    "Quality": self.roll,
                                                     "Modifiers": modifiers,
                                                     "ExperimentalEffect": self.experimental_symbol})
 
@@ -268,23 +478,26 @@ class ShieldBooster:
                 "loadout_template": loadout_template}
 
     @staticmethod
-    def create_engineered(default_booster: ShieldBooster, blueprint: json, specials: json, modifier_actions: json) -> List[ShieldBooster]:
+    def create_engineered(default_booster: ShieldBooster, blueprint: json, specials: json, modifier_actions: json,
+                          grade: int = 5, roll: float = 1) -> List[ShieldBooster]:
         """
         Create relevant booster variations.
         :param default_booster: The default booster. It will be used as a prototype
         :param blueprint: The engineering blueprint
         :param specials: json containing all experimental descriptions (specials.json)
         :param modifier_actions: json containing all experimental efffects (modifierActions.json)
+        :param grade: grade of the blueprint
+        :param roll: quality of the roll, 0 is the worst and 1 the best value of the grade
         :return: list of variations
         """
         variations = list()
 
-        booster_prototype = copy.deepcopy(default_booster)
-        booster_prototype.apply_engineered(blueprint)
+        booster_prototype = default_booster.clone()
+        booster_prototype.apply_engineered(blueprint, grade, roll)
 
         # create variations
-        for special_name in MODULE_SHIELD_BOOSTER_ENGINEERING_SPECIALS:
-            booster_variation = copy.deepcopy(booster_prototype)
+        for special_name in sorted(MODULE_SHIELD_BOOSTER_ENGINEERING_SPECIALS):
+            booster_variation = booster_prototype.clone()
             booster_variation.apply_experimental(special_name, specials, modifier_actions)
             variations.append(booster_variation)
 
@@ -310,126 +523,1942 @@ class ShieldBooster:
         return booster
 
 
-def load_shield_generators(filename):
-    a_rated_generators = list()
+def iter_shield_booster_variants(boosters_json: List[json], blueprints: json, specials: json, modifier_actions: json,
+                                 grades: List[int], rolls: List[float], use_numpy: bool = False):
+    """
+    Lazily create the data entries of all combinations of booster rating, blueprint, grade, roll and experimental effect.
+    Only one blueprint grade and roll of one booster is held in memory at a time. With use_numpy all variants are engineered at once
+    as the columns of a ShieldBoosterTable, only their data entries are created lazily.
+    :param boosters_json: json objects of coriolis-data/modules/hardpoints/shield_booster.json, one per rating
+    :param blueprints: json containing all blueprints (blueprints.json)
+    :param specials: json containing all experimental descriptions (specials.json)
+    :param modifier_actions: json containing all experimental efffects (modifierActions.json)
+    :param grades: blueprint grades, grades missing in a blueprint are skipped
+    :param rolls: qualities of the roll, 0 is the worst and 1 the best value of a grade
+    :param use_numpy: engineer the variants with ShieldBoosterTable
+    """
+    if use_numpy:
+        blueprint_list = [blueprints[x] for x in sorted(MODULE_SHIELD_BOOSTER_ENGINEERING_BLUEPRINTS)]
+        table = ShieldBoosterTable.create_engineered([ShieldBooster.create_from_json(x) for x in boosters_json], blueprint_list, specials,
+                                                     modifier_actions, grades, rolls)
+        for default_booster, variant in zip(table.defaults, table.iter_shield_boosters()):
+            yield variant.generate_data_entry(default_booster)
+        return
+
+    for booster_json in boosters_json:
+        default_booster = ShieldBooster.create_from_json(booster_json)
+        for blueprint_symbol in sorted(MODULE_SHIELD_BOOSTER_ENGINEERING_BLUEPRINTS):
+            blueprint = blueprints[blueprint_symbol]
+            for grade in grades:
+                if str(grade) not in blueprint["grades"]:
+                    continue
+                for roll in rolls:
+                    for variant in ShieldBooster.create_engineered(default_booster, blueprint, specials, modifier_actions, grade, roll):
+                        yield variant.generate_data_entry(default_booster)
+
+
+class ShieldBoosterTable:
+    """
+    Shield booster variants as numpy columns with one row per variant. Engineering is applied to all rows at once.
+    """
+    COLUMNS = ("integrity", "power", "mass", "shieldboost", "explres", "kinres", "thermres")
+    # columns changed with (1 + value) * (1 + modifier) - 1 by blueprints, the others are multiplied with (1 + modifier)
+    ADDITIVE_COLUMNS = {"shieldboost", "explres", "kinres", "thermres"}
+    RESISTANCE_COLUMNS = {"explres", "kinres", "thermres"}
+    # attribute of ShieldBooster for every column
+    ATTRIBUTES = {"integrity": "integrity",
+                  "power": "power_draw",
+                  "mass": "mass",
+                  "shieldboost": "shield_boost",
+                  "explres": "explres",
+                  "kinres": "kinres",
+                  "thermres": "thermres"}
+
+    def __init__(self, columns: Dict[str, numpy.ndarray]):
+        if numpy is None:
+            raise RuntimeError("ShieldBoosterTable requires numpy")
+        self.columns = columns
+        self.symbols = list()
+        self.defaults = list()  # default booster of every row
+        self.grades = list()  # blueprint grade of every row
+        self.rolls = list()  # quality of the roll of every row
+        self.engineering = list()  # (name, symbol) of the blueprint for every row
+        self.experimental = list()  # (name, symbol) of the experimental effect for every row
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    @staticmethod
+    def create_engineered(default_boosters: List[ShieldBooster], blueprints: List[json], specials: json, modifier_actions: json,
+                          grades: List[int] = (5,), rolls: List[float] = (1,)) -> ShieldBoosterTable:
+        """
+        Create the same variations as ShieldBooster.create_engineered for several boosters, blueprints, grades and rolls at once.
+        :param default_boosters: The default boosters, e.g. one per rating. They will be used as prototypes
+        :param blueprints: The engineering blueprints
+        :param specials: json containing all experimental descriptions (specials.json)
+        :param modifier_actions: json containing all experimental efffects (modifierActions.json)
+        :param grades: blueprint grades, grades missing in a blueprint are skipped
+        :param rolls: qualities of the roll, 0 is the worst and 1 the best value of a grade
+        :return: table with one row per variation, ordered by default booster, blueprint, grade, roll and experimental effect
+        """
+        special_names = sorted(MODULE_SHIELD_BOOSTER_ENGINEERING_SPECIALS)
+        defaults = dict((column, list()) for column in ShieldBoosterTable.COLUMNS)
+        blueprint_modifiers = dict((column, list()) for column in ShieldBoosterTable.COLUMNS)
+        experimental_modifiers = dict((column, list()) for column in ShieldBoosterTable.COLUMNS)
+        table = ShieldBoosterTable(dict())
+        for default_booster in default_boosters:
+            for blueprint in blueprints:
+                for grade in grades:
+                    if str(grade) not in blueprint["grades"]:
+                        continue
+                    features = blueprint["grades"][str(grade)]["features"]
+                    for roll in rolls:
+                        for special_name in special_names:
+                            table.symbols.append(default_booster.symbol)
+                            table.defaults.append(default_booster)
+                            table.grades.append(grade)
+                            table.rolls.append(roll)
+                            table.engineering.append((blueprint["name"], blueprint["fdname"]))
+                            table.experimental.append((specials[special_name]["name"], special_name))
+                            for column in ShieldBoosterTable.COLUMNS:
+                                defaults[column].append(float(getattr(default_booster, ShieldBoosterTable.ATTRIBUTES[column])))
+                                blueprint_modifiers[column].append(Utilities.roll_feature(features[column], roll) if column in features else 0)
+                                experimental_modifiers[column].append(modifier_actions[special_name].get(column, 0))
+
+        table.columns = dict((column, numpy.array(values, dtype=float)) for column, values in defaults.items())
+        table.apply_engineered(dict((column, numpy.array(values, dtype=float)) for column, values in blueprint_modifiers.items()))
+        table.apply_experimental(dict((column, numpy.array(values, dtype=float)) for column, values in experimental_modifiers.items()))
+        return table
+
+    def apply_engineered(self, modifiers: Dict[str, numpy.ndarray]):
+        """
+        Vectorised ShieldBooster.apply_engineered.
+        :param modifiers: blueprint modifier of every row per column, 0 if the blueprint doesn't change the column
+        """
+        for column, modifier in modifiers.items():
+            if column in ShieldBoosterTable.ADDITIVE_COLUMNS:
+                self.columns[column] = (1 + self.columns[column]) * (1 + modifier) - 1
+            else:
+                self.columns[column] = self.columns[column] * (1 + modifier)
+
+    def apply_experimental(self, modifiers: Dict[str, numpy.ndarray]):
+        """
+        Vectorised ShieldBooster.apply_experimental.
+        :param modifiers: experimental modifier of every row per column as found in modifierActions.json, 0 if the column is unchanged
+        """
+        for column, modifier in modifiers.items():
+            if column in ShieldBoosterTable.RESISTANCE_COLUMNS:
+                self.columns[column] = 1 - (1 - self.columns[column]) * (1 - modifier / 100.0)
+            elif column in ShieldBoosterTable.ADDITIVE_COLUMNS:
+                self.columns[column] = (1 + self.columns[column]) * (1 + modifier) - 1
+            else:
+                self.columns[column] = self.columns[column] * (1 + modifier)
+        for column in self.columns:
+            self.columns[column] = numpy.round(self.columns[column], 4)
+
+    def to_shield_boosters(self) -> List[ShieldBooster]:
+        return list(self.iter_shield_boosters())
+
+    def iter_shield_boosters(self):
+        """
+        Lazily create a ShieldBooster for every row.
+        """
+        values = dict((column, self.columns[column].tolist()) for column in ShieldBoosterTable.COLUMNS)
+        for row in range(len(self)):
+            booster = ShieldBooster()
+            booster.symbol = self.symbols[row]
+            booster.grade = self.grades[row]
+            booster.roll = self.rolls[row]
+            booster.engineering_name, booster.engineering_symbol = self.engineering[row]
+            booster.experimental_name, booster.experimental_symbol = self.experimental[row]
+            for column, attribute in ShieldBoosterTable.ATTRIBUTES.items():
+                setattr(booster, attribute, values[column][row])
+            yield booster
+
+    def combine(self, indices: numpy.ndarray) -> numpy.ndarray:
+        """
+        Stack boosters for many combinations at once, including diminishing returns of the resistances.
+        :param indices: one combination of row indices per row, shape (combinations, boosters)
+        :return: columns of SHIELD_BOOSTER_TABLE_STATS, shape (combinations, 4)
+        """
+        combined = numpy.empty((len(indices), len(SHIELD_BOOSTER_TABLE_STATS)))
+        combined[:, 0] = 1 + self.columns["shieldboost"][indices].sum(axis=1)
+        for i, column in enumerate(("explres", "kinres", "thermres"), start=1):
+            modifier = (1 - self.columns[column][indices]).prod(axis=1)
+            modifier = numpy.where(modifier < DIMINISHING_RETURNS_THRESHOLD, DIMINISHING_RETURNS_THRESHOLD - (DIMINISHING_RETURNS_THRESHOLD - modifier) / 2,
+                                   modifier)
+            combined[:, i] = 1 - modifier
+        return combined
+
+    def combination_tables(self, max_boosters: int, chunk_size: int = 1 << 18) -> List[Tuple[numpy.ndarray, numpy.ndarray]]:
+        """
+        Combined stats of every multiset of rows, see generate_shield_booster_tables.
+        :param max_boosters: highest number of boosters
+        :param chunk_size: number of multisets evaluated at once
+        :return: (float32 stats, uint16 row indices) for 1 to max_boosters boosters, multisets with identical stats are dropped
+        """
+        tables = list()
+        multisets = numpy.arange(len(self), dtype="<u2").reshape(-1, 1)
+        for boosters in range(1, max_boosters + 1):
+            if boosters > 1:
+                multisets = ShieldBoosterTable._extend_multisets(multisets, len(self))
+            stats = numpy.concatenate([self.combine(multisets[start:start + chunk_size]).astype("<f4")
+                                       for start in range(0, len(multisets), chunk_size)])
+            # keep the first multiset of every distinct row in enumeration order
+            _, first = numpy.unique(stats.view("V{}".format(stats.itemsize * stats.shape[1])).ravel(), return_index=True)
+            first.sort()
+            tables.append((stats[first], multisets[first]))
+        return tables
+
+    @staticmethod
+    def _extend_multisets(multisets: numpy.ndarray, rows: int) -> numpy.ndarray:
+        """
+        Append one more row index to every multiset, in the same order as itertools.combinations_with_replacement.
+        :param multisets: sorted row indices, shape (multisets, boosters)
+        :param rows: number of rows of the table
+        :return: shape (new multisets, boosters + 1)
+        """
+        last = multisets[:, -1].astype(numpy.intp)
+        counts = rows - last
+        firsts = numpy.cumsum(counts) - counts
+        appended = numpy.repeat(last, counts) + numpy.arange(counts.sum()) - numpy.repeat(firsts, counts)
+        return numpy.column_stack((numpy.repeat(multisets, counts, axis=0), appended.astype(multisets.dtype)))
+
+
+def load_shield_generators(filename, all_ratings: bool = False):
+    generators = list()
+
+    shield_generators = next(iter(source_loader.load_json(filename).values()))
+    for shield_generator in shield_generators:
+        # we only want A rated when not going through bi-weave shields
+        if not all_ratings and shield_generator["ukName"] != "Bi-Weave Shield" and shield_generator["rating"] != "A":
+            continue
+        generators.append({"symbol": shield_generator["symbol"],
+                           "integrity": shield_generator["integrity"],
+                           "power": shield_generator["power"],
+                           "explres": shield_generator["explres"],
+                           "kinres": shield_generator["kinres"],
+                           "thermres": shield_generator["thermres"],
+                           "name": shield_generator["ukName"],
+                           "class": shield_generator["class"],
+                           "regen": shield_generator["regen"],
+                           "brokenregen": shield_generator["brokenregen"],
+                           "distdraw": shield_generator["distdraw"],
+                           "maxmass": shield_generator["maxmass"],
+                           "maxmul": shield_generator["maxmul"],
+                           "minmass": shield_generator["minmass"],
+                           "minmul": shield_generator["minmul"],
+                           "optmass": shield_generator["optmass"],
+                           "optmul": shield_generator["optmul"]})
+    return generators
+
+
+def calculate_shield_strength(shield_generator: Dict, base_shield_strength: float, hull_mass: float, optmul: float = 0) -> float:
+    """
+    Shield strength of a ship with a shield generator, scaled by the mass curve of the generator like coriolis does.
+    :param shield_generator: shield generator as created by load_shield_generators
+    :param base_shield_strength: base shield strength of the ship
+    :param hull_mass: hull mass of the ship, at most maxmass of the generator
+    :param optmul: engineering modifier of the multipliers, e.g. 0.3 for +30%. It is applied to minmul, optmul and maxmul.
+    :return: shield strength in MJ
+    """
+    min_mass, opt_mass, max_mass = shield_generator["minmass"], shield_generator["optmass"], shield_generator["maxmass"]
+    min_mul, opt_mul, max_mul = (shield_generator[x] * (1 + optmul) for x in ("minmul", "optmul", "maxmul"))
+    xnorm = min(1, (max_mass - hull_mass) / (max_mass - min_mass))
+    exponent = math.log10((opt_mul - min_mul) / (max_mul - min_mul)) / math.log10(min(1, (max_mass - opt_mass) / (max_mass - min_mass)))
+    return base_shield_strength * (min_mul + xnorm ** exponent * (max_mul - min_mul))
+
+
+def can_fit_shield_generator(ship_entry: Dict, shield_generator: Dict) -> bool:
+    """
+    :return: True if the class of the generator fits the largest internal slot of the ship and the generator supports its hull mass
+    """
+    return shield_generator["class"] <= ship_entry["highest_internal"] and ship_entry["hullMass"] <= shield_generator["maxmass"]
 
-    with open(filename, "r") as shield_generator_file:
-        shield_generator_file_json = json.load(shield_generator_file)
-        shield_generators = next(iter(shield_generator_file_json.values()))
+
+def generate_shield_generator_candidates(ship_entry: Dict, shield_generator_modules: Dict[str, List[Dict]], engineering: Dict) -> List[Dict]:
+    """
+    Find the shield generators a ship can fit and evaluate their mass curve for every blueprint and experimental effect.
+    :param ship_entry: data entry of the ship
+    :param shield_generator_modules: shield generators by type as created by load_shield_generators
+    :param engineering: blueprints and experimental effects of shield generators, the engineering of the shield_generators section
+    :return: one entry per generator with a class of at most highest_internal and a maxmass of at least the hull mass.
+             shield_strength[i][j] is the strength with blueprint i - 1 and experimental effect j - 1, index 0 is unengineered.
+    """
+    blueprint_modifiers = [0] + [x["features"].get("optmul", 0) for x in engineering["blueprints"]]
+    experimental_modifiers = [0] + [x["features"].get("optmul", 0) for x in engineering["experimental_effects"]]
+
+    candidates = list()
+    for generator_type, shield_generators in shield_generator_modules.items():
         for shield_generator in shield_generators:
-            # we only want A rated when not going through bi-weave shields
-            if shield_generator["ukName"] != "Bi-Weave Shield" and shield_generator["rating"] != "A":
+            if not can_fit_shield_generator(ship_entry, shield_generator):
                 continue
-            a_rated_generators.append({"symbol": shield_generator["symbol"],
-                                       "integrity": shield_generator["integrity"],
-                                       "power": shield_generator["power"],
-                                       "explres": shield_generator["explres"],
-                                       "kinres": shield_generator["kinres"],
-                                       "thermres": shield_generator["thermres"],
-                                       "name": shield_generator["ukName"],
-                                       "class": shield_generator["class"],
-                                       "regen": shield_generator["regen"],
-                                       "brokenregen": shield_generator["brokenregen"],
-                                       "distdraw": shield_generator["distdraw"],
-                                       "maxmass": shield_generator["maxmass"],
-                                       "maxmul": shield_generator["maxmul"],
-                                       "minmass": shield_generator["minmass"],
-                                       "minmul": shield_generator["minmul"],
-                                       "optmass": shield_generator["optmass"],
-                                       "optmul": shield_generator["optmul"]})
-    return a_rated_generators
-
-
-def main():
-    ships = list()
-    standard_modules = dict()
+            shield_strength = [[round(calculate_shield_strength(shield_generator, ship_entry["baseShieldStrength"], ship_entry["hullMass"],
+                                                                (1 + blueprint_modifier) * (1 + experimental_modifier) - 1), 4)
+                                for experimental_modifier in experimental_modifiers]
+                               for blueprint_modifier in blueprint_modifiers]
+            candidates.append({"symbol": shield_generator["symbol"],
+                               "type": generator_type,
+                               "shield_strength": shield_strength})
+    return candidates
+
+
+def parse_damage_profile(damage_profile: str) -> List[str]:
+    """
+    :param damage_profile: comma separated damage types, e.g. "kinetic,thermal"
+    :return: the damage types in the order of DAMAGE_TYPE_RESISTANCES
+    """
+    damage_types = set()
+    for part in damage_profile.split(","):
+        damage_type = part.strip().lower()
+        if "=" in damage_type:
+            # weights would not change which variants are dominated, only the damage types matter
+            raise ValueError("'{}' has a weight, list the damage types only, e.g. kinetic,thermal".format(part.strip()))
+        if damage_type not in DAMAGE_TYPE_RESISTANCES:
+            raise ValueError("unknown damage type '{}', expected one of {}".format(damage_type, ", ".join(DAMAGE_TYPE_RESISTANCES)))
+        damage_types.add(damage_type)
+    return [x for x in DAMAGE_TYPE_RESISTANCES if x in damage_types]
+
+
+def prune_dominated_variants(booster_variants: List[Dict], damage_profile: Optional[List[str]] = None) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Drop shield booster variants that are dominated by another variant: not better on any axis and worse on at least one.
+    The axes are the shield strength bonus and the resistances of the damage types in damage_profile.
+    Of several variants with identical stats only the first is kept.
+    :param booster_variants: data entries of the shield booster variants
+    :param damage_profile: damage types, see parse_damage_profile. All damage types are used if None
+    :return: the remaining variants in their original order and a description of every pruned variant
+    """
+    axes = ["shield_strength_bonus"]
+    for damage_type, resistance in DAMAGE_TYPE_RESISTANCES.items():
+        if damage_profile is None or damage_type in damage_profile:
+            axes.append(resistance)
+    stats = [tuple(variant[axis] for axis in axes) for variant in booster_variants]
+
+    kept = list()
+    pruned = list()
+    for i, variant in enumerate(booster_variants):
+        reason = None
+        for j, other in enumerate(booster_variants):
+            if i == j:
+                continue
+            if stats[j] == stats[i]:
+                if j < i:
+                    reason = "identical"
+                    break
+            elif all(a >= b for a, b in zip(stats[j], stats[i])):
+                reason = "dominated"
+                break
+        if reason is None:
+            kept.append(variant)
+        else:
+            pruned.append({"engineering": variant["engineering"],
+                           "experimental": variant["experimental"],
+                           "reason": reason,
+                           "by": {"engineering": other["engineering"], "experimental": other["experimental"]},
+                           "axes": axes})
+    return kept, pruned
+
+
+def apply_diminishing_returns(resistance_modifier: float) -> float:
+    """
+    Shield boosters stack their resistances multiplicatively. Once the damage taken drops below 70% the remaining bonus is halved.
+    :param resistance_modifier: product of (1 - resistance) of all boosters
+    :return: modifier of the damage taken
+    """
+    if resistance_modifier < DIMINISHING_RETURNS_THRESHOLD:
+        return DIMINISHING_RETURNS_THRESHOLD - (DIMINISHING_RETURNS_THRESHOLD - resistance_modifier) / 2
+    return resistance_modifier
+
+
+def generate_shield_booster_tables(booster_variants: List[Dict], max_boosters: int, filename: str, use_numpy: bool = False) -> Dict:
+    """
+    Write the combined stats of every multiset of 1 to max_boosters shield boosters into a binary file.
+    Every table holds rows of 4 little-endian float32 (see SHIELD_BOOSTER_TABLE_STATS) followed by the variant indices of each row
+    as little-endian uint16. Multisets sharing the same stats are only written once.
+    A shield generator is applied with: resistance = 1 - (1 - generator resistance) * (1 - table resistance)
+    :param booster_variants: data entries of the shield booster variants, indices refer to this list
+    :param max_boosters: highest number of boosters
+    :param filename: path of the binary file
+    :param use_numpy: combine the boosters with ShieldBoosterTable instead of one multiset at a time
+    :return: index describing the tables within the file
+    """
+    # variants with identical stats can't produce different combinations
+    stats = list()
+    representatives = list()
+    seen_variants = set()
+    for i, variant in enumerate(booster_variants):
+        variant_stats = (variant["shield_strength_bonus"], variant["exp_res_bonus"], variant["kin_res_bonus"], variant["therm_res_bonus"])
+        if variant_stats not in seen_variants:
+            seen_variants.add(variant_stats)
+            stats.append(variant_stats)
+            representatives.append(i)
+
+    if use_numpy:
+        booster_table = ShieldBoosterTable(dict((column, numpy.array([x[i] for x in stats], dtype=float))
+                                                for i, column in enumerate(("shieldboost", "explres", "kinres", "thermres"))))
+        combination_tables = [(table_stats.ravel(), numpy.array(representatives, dtype="<u2")[table_variants].ravel())
+                              for table_stats, table_variants in booster_table.combination_tables(max_boosters)]
+    else:
+        combination_tables = _combine_shield_boosters(stats, representatives, max_boosters)
+
+    tables = list()
+    with open(filename, "wb") as tables_file:
+        for boosters, (table_stats, table_variants) in enumerate(combination_tables, start=1):
+            stats_offset = tables_file.tell()
+            table_stats.tofile(tables_file)
+            variants_offset = tables_file.tell()
+            table_variants.tofile(tables_file)
+            tables.append({"boosters": boosters,
+                           "rows": len(table_variants) // boosters,
+                           "stats_offset": stats_offset,
+                           "variants_offset": variants_offset})
+
+    return {"stats": SHIELD_BOOSTER_TABLE_STATS,
+            "stats_format": "<f4",
+            "variants_format": "<u2",
+            "variants": len(booster_variants),
+            "tables": tables}
+
+
+def _combine_shield_boosters(stats: List[Tuple[float, float, float, float]], representatives: List[int],
+                             max_boosters: int) -> List[Tuple[array.array, array.array]]:
+    table_stats = [array.array("f") for _ in range(max_boosters)]
+    table_variants = [array.array("H") for _ in range(max_boosters)]
+    seen_rows = [set() for _ in range(max_boosters)]
+    chosen = list()
+
+    def add_boosters(start: int, shield_boost: float, exp_modifier: float, kin_modifier: float, therm_modifier: float):
+        depth = len(chosen)
+        for i in range(start, len(stats)):
+            boost, explres, kinres, thermres = stats[i]
+            row = (1 + shield_boost + boost,
+                   1 - apply_diminishing_returns(exp_modifier * (1 - explres)),
+                   1 - apply_diminishing_returns(kin_modifier * (1 - kinres)),
+                   1 - apply_diminishing_returns(therm_modifier * (1 - thermres)))
+            chosen.append(representatives[i])
+            key = struct.pack("<4f", *row)
+            if key not in seen_rows[depth]:
+                seen_rows[depth].add(key)
+                table_stats[depth].extend(row)
+                table_variants[depth].extend(chosen)
+            if depth + 1 < max_boosters:
+                add_boosters(i, shield_boost + boost, exp_modifier * (1 - explres), kin_modifier * (1 - kinres), therm_modifier * (1 - thermres))
+            chosen.pop()
+
+    add_boosters(0, 0, 1, 1, 1)
+
+    if sys.byteorder != "little":
+        for column in table_stats + table_variants:
+            column.byteswap()
+    return list(zip(table_stats, table_variants))
+
+
+def write_columns(filename: str, tables: Dict[str, Dict[str, array.array]], symbols: Dict[str, List[str]]) -> Dict:
+    """
+    Write numeric fields as columns of little-endian float64 that consumers can memory map instead of reading the json entries.
+    The file starts with COLUMNS_MAGIC, the length of a json header as <I and the header, which is the returned index.
+    Every column starts at a multiple of COLUMNS_ALIGNMENT bytes. The file is replaced at once, existing mappings stay valid.
+    :param filename: path of the binary file
+    :param tables: table -> column -> values, all columns of a table have the same length
+    :param symbols: table -> symbol of every row, for tables whose rows are not in the order of a list section of data.json
+    :return: index with the number of rows and the offset of every column of every table
+    """
+    data_offset = COLUMNS_ALIGNMENT
+    while True:
+        # the offsets are part of the header, repeat until the header fits in front of the first column
+        index = {"format": "<f8", "tables": dict()}
+        offset = data_offset
+        for table, columns in tables.items():
+            rows = len(next(iter(columns.values()))) if columns else 0
+            index["tables"][table] = {"rows": rows, "columns": dict()}
+            if table in symbols:
+                index["tables"][table]["symbols"] = symbols[table]
+            for column in columns:
+                index["tables"][table]["columns"][column] = offset
+                offset += -(-rows * 8 // COLUMNS_ALIGNMENT) * COLUMNS_ALIGNMENT
+        header = json.dumps(index, separators=(",", ":")).encode("utf-8")
+        header_end = len(COLUMNS_MAGIC) + 4 + len(header)
+        if header_end <= data_offset:
+            break
+        data_offset = -(-header_end // COLUMNS_ALIGNMENT) * COLUMNS_ALIGNMENT
+
+    with open(filename + ".tmp", "wb") as columns_file:
+        columns_file.write(COLUMNS_MAGIC + struct.pack("<I", len(header)) + header)
+        for table, columns in tables.items():
+            for column, values in columns.items():
+                columns_file.write(b"\0" * (index["tables"][table]["columns"][column] - columns_file.tell()))
+                values = array.array("d", values)
+                if sys.byteorder != "little":
+                    values.byteswap()
+                values.tofile(columns_file)
+        columns_file.write(b"\0" * (offset - columns_file.tell()))
+    os.replace(filename + ".tmp", filename)
+    return index
+
+
+def map_columns(filename: str) -> Dict[str, Dict[str, memoryview]]:
+    """
+    Memory map a file written by write_columns. Nothing is copied, processes mapping the same file share its pages.
+    numpy.frombuffer(column) turns a column into an array without copying it.
+    :param filename: path of the binary file
+    :return: table -> column -> float64 values
+    :raises ValueError: if the file is no columns file or this machine is not little-endian
+    """
+    if sys.byteorder != "little":
+        raise ValueError("{}: the columns are little-endian and can't be mapped on this machine".format(filename))
+    with open(filename, "rb") as columns_file:
+        mapped = mmap.mmap(columns_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapped[:len(COLUMNS_MAGIC)] != COLUMNS_MAGIC:
+        raise ValueError("{} is not a columns file".format(filename))
+    header_length = struct.unpack_from("<I", mapped, len(COLUMNS_MAGIC))[0]
+    index = json.loads(mapped[len(COLUMNS_MAGIC) + 4:len(COLUMNS_MAGIC) + 4 + header_length].decode("utf-8"))
+    view = memoryview(mapped)
+    return dict((table, dict((column, view[offset:offset + 8 * description["rows"]].cast("d"))
+                             for column, offset in description["columns"].items()))
+                for table, description in index["tables"].items())
+
+
+class DataWriter:
+    """
+    Base of the writers of the output. Sections are written one after another, list sections one entry at a time.
+    The output is written to a temporary file that replaces filename when closed, readers never see a partial file.
+    """
+    def __init__(self, filename: str, mode: str):
+        self.filename = filename
+        self._file = open(filename + ".tmp", mode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_value(self, name: str, value: json):
+        raise NotImplementedError
+
+    def begin_list(self, name: str):
+        raise NotImplementedError
+
+    def write_item(self, entry: json):
+        raise NotImplementedError
+
+    def end_list(self):
+        raise NotImplementedError
+
+    def close(self):
+        self._file.close()
+        os.replace(self._file.name, self.filename)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._file.name)
+
+
+class JsonDataWriter(DataWriter):
+    """
+    Write json one entry at a time. The indented output is identical to json.dump(..., indent="  ").
+    """
+    def __init__(self, filename: str, compact: bool = False):
+        super().__init__(filename, "w")
+        self.compact = compact
+        self._file.write("{")
+        self._sections = 0
+        self._items = 0
+
+    def _dumps(self, value: json, depth: int) -> str:
+        if self.compact:
+            return json.dumps(value, separators=(",", ":"))
+        return json.dumps(value, indent="  ").replace("\n", "\n" + "  " * depth)
+
+    def _begin_section(self, name: str):
+        separator = "," if self._sections else ""
+        if self.compact:
+            self._file.write("{}{}:".format(separator, json.dumps(name)))
+        else:
+            self._file.write("{}\n  {}: ".format(separator, json.dumps(name)))
+        self._sections += 1
+
+    def write_value(self, name: str, value: json):
+        self._begin_section(name)
+        self._file.write(self._dumps(value, 1))
+
+    def begin_list(self, name: str):
+        self._begin_section(name)
+        self._file.write("[")
+        self._items = 0
+
+    def write_item(self, entry: json):
+        separator = "," if self._items else ""
+        self._file.write(separator if self.compact else separator + "\n    ")
+        self._file.write(self._dumps(entry, 2))
+        self._items += 1
+
+    def end_list(self):
+        self._file.write("]" if self.compact or not self._items else "\n  ]")
+
+    def close(self):
+        self._file.write("}" if self.compact or not self._sections else "\n}")
+        super().close()
+
+
+class RecordDataWriter(DataWriter):
+    """
+    Write data as length-prefixed records which can be skipped without decoding them, see load_data_file.
+    The file starts with RECORDS_MAGIC and the codec of the payloads. Every record consists of the record kind (uint8),
+    the length of the section name (uint16), the section name, the length of the payload (uint32) and the payload, little-endian.
+    """
+    def __init__(self, filename: str, codec: str = "json"):
+        if codec == "msgpack" and msgpack is None:
+            raise RuntimeError("the msgpack codec requires msgpack")
+        super().__init__(filename, "wb")
+        self.codec = codec
+        self._file.write(RECORDS_MAGIC + struct.pack("<B", RECORDS_CODECS.index(codec)))
+        self._section = ""
+
+    def _write_record(self, kind: int, name: str, value: json = None):
+        if kind == RECORD_LIST:
+            payload = b""
+        elif self.codec == "msgpack":
+            payload = msgpack.packb(value)
+        else:
+            payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        name = name.encode("utf-8")
+        self._file.write(struct.pack("<BH", kind, len(name)) + name + struct.pack("<I", len(payload)))
+        self._file.write(payload)
+
+    def write_value(self, name: str, value: json):
+        self._write_record(RECORD_VALUE, name, value)
+
+    def begin_list(self, name: str):
+        self._section = name
+        self._write_record(RECORD_LIST, name)
+
+    def write_item(self, entry: json):
+        self._write_record(RECORD_ITEM, self._section, entry)
+
+    def end_list(self):
+        self._section = ""
+
+
+def open_data_writer(filename: str, data_format: str = "json") -> DataWriter:
+    """
+    :param filename: path of the output
+    :param data_format: one of DATA_FORMATS
+    :return: JsonDataWriter or RecordDataWriter
+    """
+    if data_format in ("json", "compact"):
+        return JsonDataWriter(filename, compact=data_format == "compact")
+    return RecordDataWriter(filename, codec="msgpack" if data_format == "msgpack" else "json")
+
+
+def _iter_records(filename: str, sections: Optional[List[str]] = None):
+    with open(filename, "rb") as records_file:
+        codec = RECORDS_CODECS[struct.unpack("<B", records_file.read(len(RECORDS_MAGIC) + 1)[-1:])[0]]
+        while True:
+            header = records_file.read(3)
+            if not header:
+                break
+            kind, name_length = struct.unpack("<BH", header)
+            name = records_file.read(name_length).decode("utf-8")
+            payload_length = struct.unpack("<I", records_file.read(4))[0]
+            if sections is not None and name not in sections:
+                records_file.seek(payload_length, os.SEEK_CUR)  # skipped without reading or decoding
+                continue
+            payload = records_file.read(payload_length)
+            if kind == RECORD_LIST:
+                yield kind, name, None
+            elif codec == "msgpack":
+                yield kind, name, msgpack.unpackb(payload)
+            else:
+                yield kind, name, json.loads(payload.decode("utf-8"))
+
+
+def is_records_file(filename: str) -> bool:
+    with open(filename, "rb") as data_file:
+        return data_file.read(len(RECORDS_MAGIC)) == RECORDS_MAGIC
+
+
+def load_data_file(filename: str, sections: Optional[List[str]] = None, resolve_templates: bool = False) -> Dict:
+    """
+    Load data written by any of the DATA_FORMATS.
+    :param filename: path of the data file
+    :param sections: only load these sections, e.g. ["ships"]. Other records of a binary file are skipped without decoding them.
+    :param resolve_templates: rebuild loadout templates written with --shared-templates
+    :return: the data as it would have been read by json.load
+    """
+    if sections is not None and resolve_templates:
+        sections = list(sections) + ["shared_templates"]
+
+    if not is_records_file(filename):
+        with open(filename, "r") as data_file:
+            data = json.load(data_file)
+        if sections is not None:
+            data = dict((k, v) for k, v in data.items() if k in sections)
+    else:
+        data = dict()
+        for kind, name, value in _iter_records(filename, sections):
+            if kind == RECORD_LIST:
+                data[name] = list()
+            elif kind == RECORD_ITEM:
+                data[name].append(value)
+            else:
+                data[name] = value
+
+    if resolve_templates and "shared_templates" in data:
+        shared_templates = data.pop("shared_templates")
+        for section in ("ships", "shield_booster_variants"):
+            for entry in data.get(section, list()):
+                entry["loadout_template"] = resolve_shared_templates(entry["loadout_template"], shared_templates)
+    return data
+
+
+def iter_data_section(filename: str, section: str, resolve_templates: bool = False):
+    """
+    Iterate over the entries of a list section, e.g. ships. Binary files are read lazily, one record at a time.
+    :param filename: path of the data file
+    :param section: name of the section
+    :param resolve_templates: rebuild loadout templates written with --shared-templates
+    """
+    if not is_records_file(filename):
+        yield from load_data_file(filename, [section], resolve_templates).get(section, list())
+        return
+    shared_templates = load_data_file(filename, ["shared_templates"]).get("shared_templates") if resolve_templates else None
+    for kind, name, value in _iter_records(filename, [section]):
+        if kind == RECORD_ITEM:
+            if shared_templates is not None:
+                value["loadout_template"] = resolve_shared_templates(value["loadout_template"], shared_templates)
+            yield value
+
+
+class ShardedDataWriter:
+    """
+    Write the output into one file per shard, e.g. data.ship-class-1.json. Without shards everything goes into filename.
+    Each shard has its own shared templates if they are enabled.
+    """
+    def __init__(self, filename: str, data_format: str = "json", sharded: bool = False, shared_templates: bool = False):
+        self.filename = filename
+        self.data_format = data_format
+        self.shared_templates = shared_templates
+        self.writers = dict()  # shard -> DataWriter
+        self._interners = dict()
+        self._list = None
+        if not sharded:
+            self._open("")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def outputs(self) -> List[str]:
+        return [writer.filename for writer in self.writers.values()]
+
+    def shard_filename(self, shard: str) -> str:
+        if not shard:
+            return self.filename
+        root, extension = os.path.splitext(self.filename)
+        return "{}.{}{}".format(root, shard, extension)
+
+    def _open(self, shard: str) -> DataWriter:
+        writer = open_data_writer(self.shard_filename(shard), self.data_format)
+        self.writers[shard] = writer
+        self._interners[shard] = TemplateInterner() if self.shared_templates else None
+        if self._list is not None:
+            writer.begin_list(self._list)  # shard opened in the middle of a list
+        return writer
+
+    def add_shards(self, shards: List[str]):
+        for shard in shards:
+            if shard not in self.writers:
+                self._open(shard)
+
+    def write_value(self, name: str, value: json, shard_value: Optional[Callable[[str], json]] = None):
+        """
+        :param name: name of the section
+        :param value: value written to every shard
+        :param shard_value: function returning the value of a shard instead
+        """
+        for shard, writer in self.writers.items():
+            writer.write_value(name, value if shard_value is None else shard_value(shard))
+
+    def begin_list(self, name: str):
+        self._list = name
+        for writer in self.writers.values():
+            writer.begin_list(name)
+
+    def write_item(self, entry: json, shards: Optional[List[str]] = None):
+        """
+        :param entry: entry of the current list
+        :param shards: shards receiving the entry, all shards if None. Missing shards are opened.
+        """
+        for shard in (list(self.writers) if shards is None else shards):
+            writer = self.writers.get(shard) or self._open(shard)
+            interner = self._interners[shard]
+            writer.write_item(interner.encode_entry(entry) if interner else entry)
+
+    def end_list(self):
+        self._list = None
+        for writer in self.writers.values():
+            writer.end_list()
+
+    def close(self):
+        for shard, writer in self.writers.items():
+            if self._interners[shard]:
+                writer.write_value("shared_templates", self._interners[shard].shared)
+            writer.close()
 
-    # default loadout for a ship
+    def abort(self):
+        for writer in self.writers.values():
+            writer.abort()
+
+
+class TemplateInterner:
+    """
+    Replace repeated parts of loadout templates by references into a shared table.
+    The leading scalar values of every dict, e.g. the Item, Slot, On and Priority of a module, are stored once in the table.
+    The dict keeps {SHARED_TEMPLATE_REFERENCE: index} followed by its remaining keys, see resolve_shared_templates.
+    """
+    def __init__(self):
+        self.shared = list()
+        self._indices = dict()
+
+    def encode(self, value: json) -> json:
+        if isinstance(value, list):
+            return [self.encode(x) for x in value]
+        if not isinstance(value, dict):
+            return value
+
+        items = list(value.items())
+        prefix = 0
+        while prefix < len(items) and not isinstance(items[prefix][1], (dict, list)):
+            prefix += 1
+        if prefix == 0:
+            return dict((k, self.encode(v)) for k, v in items)
+
+        shared = dict(items[:prefix])
+        key = json.dumps(shared)
+        if key not in self._indices:
+            self._indices[key] = len(self.shared)
+            self.shared.append(shared)
+        encoded = {SHARED_TEMPLATE_REFERENCE: self._indices[key]}
+        for k, v in items[prefix:]:
+            encoded[k] = self.encode(v)
+        return encoded
+
+    def encode_entry(self, entry: Dict) -> Dict:
+        """
+        :param entry: ship or shield booster entry
+        :return: copy of the entry with an encoded loadout template
+        """
+        return dict(entry, loadout_template=self.encode(entry["loadout_template"]))
+
+
+def resolve_shared_templates(value: json, shared_templates: List[Dict]) -> json:
+    """
+    Rebuild what TemplateInterner encoded.
+    :param value: encoded value, e.g. the loadout template of an entry
+    :param shared_templates: the shared_templates section of the data
+    :return: value with all references replaced by new dicts
+    """
+    if isinstance(value, list):
+        return [resolve_shared_templates(x, shared_templates) for x in value]
+    if not isinstance(value, dict):
+        return value
+    resolved = dict()
+    for k, v in value.items():
+        if k == SHARED_TEMPLATE_REFERENCE:
+            resolved.update(shared_templates[v])
+        else:
+            resolved[k] = resolve_shared_templates(v, shared_templates)
+    return resolved
+
+
+class BuildProfiler:
+    """
+    Time and memory of the stages of a build. Does nothing unless enabled.
+    Memory is traced with tracemalloc and only covers this process, not the workers of --workers.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.stages = list()
+        self.counts = dict()
+        self.inputs = dict()
+        self._open_stages = list()
+        self._start = time.perf_counter()
+        # tracing slows down every allocation, it is only stopped again if this profiler started it
+        self._started_tracing = enabled and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def stop(self):
+        """
+        Stop tracing memory if this profiler started it. Stages measured afterwards report 0 bytes.
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _update_peaks(self):
+        # tracemalloc has a single peak, it is reset for every stage and passed on to all stages still open
+        peak = tracemalloc.get_traced_memory()[1]
+        for stage in self._open_stages:
+            stage["memory_peak"] = max(stage["memory_peak"], peak)
+        tracemalloc.reset_peak()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, **counters):
+        """
+        Measure the enclosed block. Stages can be nested.
+        :param name: name of the stage
+        :param counters: additional values stored with the stage, e.g. the number of items
+        """
+        if not self.enabled:
+            yield counters
+            return
+        self._update_peaks()
+        stage = {"name": name,
+                 "start": time.perf_counter() - self._start,
+                 "depth": len(self._open_stages),
+                 "memory_start": tracemalloc.get_traced_memory()[0],
+                 "memory_peak": 0,
+                 "counters": counters}
+        self._open_stages.append(stage)
+        self.stages.append(stage)
+        try:
+            yield counters
+        finally:
+            self._update_peaks()
+            self._open_stages.pop()
+            stage["duration"] = time.perf_counter() - self._start - stage["start"]
+            stage["memory_end"] = tracemalloc.get_traced_memory()[0]
+
+    def count(self, name: str, value: int):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def add_inputs(self, filenames: List[str]):
+        if self.enabled:
+            for filename in filenames:
+                self.inputs[os.path.relpath(filename)] = os.path.getsize(filename)
+
+    def report(self) -> Dict:
+        return {"total_seconds": time.perf_counter() - self._start,
+                "memory_peak": max([stage["memory_peak"] for stage in self.stages], default=0),
+                "stages": self.stages,
+                "counts": self.counts,
+                "inputs": self.inputs,
+                "input_bytes": sum(self.inputs.values())}
+
+    def chrome_trace(self) -> Dict:
+        """
+        :return: the stages in the Trace Event Format of chrome://tracing and Perfetto
+        """
+        events = list()
+        for stage in self.stages:
+            args = dict(stage["counters"], memory_start=stage["memory_start"], memory_end=stage["memory_end"], memory_peak=stage["memory_peak"])
+            events.append({"name": stage["name"], "ph": "X", "pid": os.getpid(), "tid": 0,
+                           "ts": stage["start"] * 1e6, "dur": stage["duration"] * 1e6, "args": args})
+        return {"traceEvents": events, "otherData": {"counts": self.counts, "inputs": self.inputs}}
+
+    def save(self, filename: str, profile_format: str = "json"):
+        with open(filename, "w") as profile_file:
+            json.dump(self.chrome_trace() if profile_format == "chrome" else self.report(), profile_file, indent="  ")
+
+
+class SourceLoader:
+    """
+    Parses the json and csv files of coriolis-data and FDevIDs at most once per process. Files with the same content, e.g. in several
+    snapshots of coriolis-data, are parsed once per process. With a directory, the parsed files are also stored as marshal files, so
+    later runs only parse files with a new content.
+    Files are looked up by the digests of their content in digests, which build sets to the digests of BuildCache, so both agree on
+    which files changed. Files without a digest are only read again when their modification time or size changed.
+    A parsed content is dropped from memory once no path was last loaded with it, e.g. the previous version of a file changed under --serve.
+    The returned objects are shared by all callers and must not be modified.
+    """
+    VERSION = 2
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.digests = dict()  # absolute path -> digest of the content as computed by Utilities.file_digest
+        self.parsed = dict()  # absolute path -> ((mtime, size), data) of the files without a digest
+        self.contents = dict()  # (digest of the content, kind) -> data
+        self.used_contents = dict()  # absolute path -> key of contents it was loaded from last
+        self.hits = 0  # files read from memory or the directory
+        self.misses = 0  # files that had to be parsed
+
+    def load_json(self, filename: str) -> json:
+        return self._load(filename, "json", json.loads)
+
+    def load_csv(self, filename: str) -> List[Dict[str, str]]:
+        """
+        :return: the rows of the file as read by csv.DictReader
+        """
+        return self._load(filename, "csv", lambda text: list(csv.DictReader(io.StringIO(text))))
+
+    def _load(self, filename: str, kind: str, parse: Callable[[str], json]) -> json:
+        path = os.path.abspath(filename)
+        digest = self.digests.get(path)
+        if digest is not None:
+            return self._load_content(path, digest, None, kind, parse)
+
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        parsed = self.parsed.get(path)
+        if parsed is not None and parsed[0] == key:
+            self.hits += 1
+            return parsed[1]
+
+        # without a digest the digest of the content is remembered per path, an unchanged file is not even read
+        path_filename, path_header = self._cache_filename(path, "path"), (SourceLoader.VERSION, path, kind) + key
+        content = None
+        found, digest = self._read_cached(path_filename, path_header)
+        if not found:
+            with open(path, "rb") as source_file:
+                content = source_file.read()
+            digest = hashlib.sha1(content).hexdigest()
+            self._write_cached(path_filename, path_header, digest)
+        data = self._load_content(path, digest, content, kind, parse)
+        self.parsed[path] = (key, data)
+        return data
+
+    def _load_content(self, path: str, digest: str, content: Optional[bytes], kind: str, parse: Callable[[str], json]) -> json:
+        data = self.contents.get((digest, kind))
+        if data is not None:
+            self.hits += 1
+            self._use_content(path, (digest, kind))
+            return data
+
+        data_filename, data_header = self._cache_filename(digest, kind), (SourceLoader.VERSION, digest, kind)
+        found, data = self._read_cached(data_filename, data_header)
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+            if content is None:
+                with open(path, "rb") as source_file:
+                    content = source_file.read()
+                # a file changed since it was hashed is stored under the digest of what was parsed, never under the old one
+                digest = hashlib.sha1(content).hexdigest()
+                data_filename, data_header = self._cache_filename(digest, kind), (SourceLoader.VERSION, digest, kind)
+            data = parse(content.decode("utf-8"))
+            self._write_cached(data_filename, data_header, data)
+        self.contents[(digest, kind)] = data
+        self._use_content(path, (digest, kind))
+        return data
+
+    def _use_content(self, path: str, content_key: Tuple[str, str]):
+        # a long running process, e.g. --serve, would otherwise keep every version of every file it ever loaded
+        previous_key = self.used_contents.get(path)
+        self.used_contents[path] = content_key
+        if previous_key is not None and previous_key != content_key and previous_key not in self.used_contents.values():
+            self.contents.pop(previous_key, None)
+
+    def _cache_filename(self, name: str, kind: str) -> Optional[str]:
+        if not self.directory:
+            return None
+        return os.path.join(self.directory, "{}.{}.marshal".format(hashlib.sha1(name.encode("utf-8")).hexdigest(), kind))
+
+    @staticmethod
+    def _read_cached(filename: Optional[str], header: Tuple) -> Tuple[bool, json]:
+        if filename is None:
+            return False, None
+        try:
+            with open(filename, "rb") as cache_file:
+                cached_header, value = marshal.load(cache_file)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False, None  # missing or broken, read the file again
+        # the marshal format may change between python versions
+        return cached_header == (sys.implementation.cache_tag,) + header, value
+
+    def _write_cached(self, filename: Optional[str], header: Tuple, value: json):
+        if filename is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # several worker processes may write the same file, each one writes a file of its own and replaces the old one
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as cache_file:
+                marshal.dump(((sys.implementation.cache_tag,) + header, value), cache_file)
+            os.replace(temporary, filename)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(temporary)
+
+
+# loader of all source files, main sets its directory
+source_loader = SourceLoader()
+
+
+class BuildCache:
+    """
+    Content hashes of the source files together with the data entries derived from them.
+    Entries whose hash did not change are spliced back into data.json instead of being derived again.
+    """
+    VERSION = 1
+
+    def __init__(self, filename: str, force: bool = False):
+        self.filename = filename
+        self.sources = dict()  # digest of every source file of the previous run
+        self.options = dict()  # options of the previous run
+        self.outputs = list()  # files written by the previous run
+        self.sections = dict()  # section -> key -> {"digest": ..., "entry": ...}
+        self.rebuilt = list()
+        self.used_sections = dict()
+        # entries derived by a different version of this script can't be reused
+        self.generator = Utilities.file_digest(os.path.abspath(__file__))
+
+        if not force and os.path.exists(filename):
+            try:
+                with open(filename, "r") as cache_file:
+                    cache_json = json.load(cache_file)
+            except (OSError, ValueError):
+                cache_json = dict()  # a broken cache only costs a full rebuild
+            if cache_json.get("version") == BuildCache.VERSION and cache_json.get("generator") == self.generator:
+                self.sources = cache_json.get("sources", dict())
+                self.options = cache_json.get("options", dict())
+                self.outputs = cache_json.get("outputs", list())
+                self.sections = cache_json.get("sections", dict())
+
+    def get(self, section: str, key: str, digest: str, build: Callable[[], json], outputs: Optional[List[str]] = None) -> json:
+        """
+        Return the cached entry if its digest matches, otherwise build and remember it.
+        :param section: section of data.json, e.g. ships
+        :param key: unique key of the entry within the section, e.g. the ship file name
+        :param digest: digest of everything the entry is derived from
+        :param build: function deriving the entry
+        :param outputs: files written by build, the cached entry is only valid while they are unchanged
+        :return: the entry
+        """
+        outputs = outputs or list()
+        cached = self.sections.get(section, dict()).get(key)
+        if self.is_cached(section, key, digest) and BuildCache._outputs_unchanged(cached.get("outputs", dict()), outputs):
+            entry = cached["entry"]
+            output_digests = cached.get("outputs", dict())
+        else:
+            entry = build()
+            output_digests = dict((path, Utilities.file_digest(path)) for path in outputs)
+            self.rebuilt.append((section, key))
+        self.used_sections.setdefault(section, dict())[key] = {"digest": digest, "entry": entry, "outputs": output_digests}
+        return entry
+
+    @staticmethod
+    def _outputs_unchanged(output_digests: Dict[str, str], outputs: List[str]) -> bool:
+        for path in outputs:
+            if not os.path.exists(path) or output_digests.get(path) != Utilities.file_digest(path):
+                return False
+        return True
+
+    def is_up_to_date(self, sources: Dict[str, str], options: Dict) -> bool:
+        """
+        :param sources: digest of every source file
+        :param options: command line options that change the output
+        :return: True if the last run used the same sources and options and its outputs still exist
+        """
+        return sources == self.sources and options == self.options and bool(self.outputs) and all(os.path.exists(path) for path in self.outputs)
+
+    def is_cached(self, section: str, key: str, digest: str) -> bool:
+        cached = self.sections.get(section, dict()).get(key)
+        return cached is not None and cached["digest"] == digest
+
+    def removed(self) -> List[Tuple[str, str]]:
+        """
+        :return: (section, key) of entries that were cached but whose source no longer exists
+        """
+        removed = list()
+        for section, entries in self.sections.items():
+            for key in entries:
+                if key not in self.used_sections.get(section, dict()):
+                    removed.append((section, key))
+        return removed
+
+    def save(self, sources: Dict[str, str], options: Dict, outputs: List[str]):
+        with open(self.filename, "w") as cache_file:
+            json.dump({"version": BuildCache.VERSION,
+                       "generator": self.generator,
+                       "sources": sources,
+                       "options": options,
+                       "outputs": outputs,
+                       "sections": self.used_sections}, cache_file)
+
+
+class SourceRoot:
+    """
+    Paths of the source files in a directory containing coriolis-data and FDevIDs, e.g. a checkout of this repository.
+    """
+    def __init__(self, root: str):
+        coriolis_data = os.path.join(root, "coriolis-data")
+        self.root = root
+        self.ships = os.path.join(coriolis_data, "ships")
+        self.modules_standard = os.path.join(coriolis_data, "modules", "standard")
+        self.shipyard = os.path.join(root, "FDevIDs", "shipyard.csv")
+        self.shield_generators = {"bi-weave": os.path.join(coriolis_data, "modules", "internal", "bi_weave_shield_generator.json"),
+                                  "prismatic": os.path.join(coriolis_data, "modules", "internal", "pristmatic_shield_generator.json"),
+                                  "normal": os.path.join(coriolis_data, "modules", "internal", "shield_generator.json")}
+        self.shield_booster = os.path.join(coriolis_data, "modules", "hardpoints", "shield_booster.json")
+        self.engineering_blueprints = os.path.join(coriolis_data, "modifications", "blueprints.json")
+        self.engineering_specials = os.path.join(coriolis_data, "modifications", "specials.json")
+        self.engineering_special_actions = os.path.join(coriolis_data, "modifications", "modifierActions.json")
+
+    def files(self) -> List[str]:
+        """
+        :return: every source file read by a build, the ship files first
+        """
+        return (find_ship_files(self.ships) + [self.shipyard]
+                + [os.path.join(self.modules_standard, file) for file in sorted(MODULES_STANDARD_FILE_NAMES.values())]
+                + list(self.shield_generators.values())
+                + [self.engineering_blueprints, self.engineering_specials, self.engineering_special_actions, self.shield_booster])
+
+
+def load_standard_modules(directory: str = PATH_TO_MODULES_STANDARD) -> Dict[str, Dict[Tuple[int, str], str]]:
+    standard_modules = dict()
     for standard_module, file in MODULES_STANDARD_FILE_NAMES.items():
-        with open(os.path.join(PATH_TO_MODULES_STANDARD, file)) as module_file:
-            standard_modules.setdefault(standard_module, json.load(module_file))
+        standard_modules.setdefault(standard_module, Ship.index_standard_modules(source_loader.load_json(os.path.join(directory, file))))
+    return standard_modules
+
 
+def load_ship_name_to_symbol(filename: str = PATH_TO_SHIPYARD) -> Dict[str, str]:
     # ship name in game vs internal name
     ship_name_to_symbol = {"cobra mk iii": "CobraMkIII",
                            "cobra mk iv": "CobraMkIV",
                            "krait mk ii": "Krait_MkII",
                            "viper": "Viper",
                            "viper mk iv": "Viper_MkIV"}
-    with open(PATH_TO_SHIPYARD, "r") as shipyard_file:
-        reader = csv.DictReader(shipyard_file)
-        for row in reader:
-            ship_name_to_symbol.setdefault(row["name"].lower(), row["symbol"])
-    ship_symbol_to_name = dict((v, k) for k, v in ship_name_to_symbol.items())
-
-    # ships
-    for root, dirs, files in os.walk(PATH_TO_SHIPS):
+    for row in source_loader.load_csv(filename):
+        ship_name_to_symbol.setdefault(row["name"].lower(), row["symbol"])
+    return ship_name_to_symbol
+
+
+def find_ship_files(directory: str = PATH_TO_SHIPS) -> List[str]:
+    ship_files = list()
+    for root, dirs, files in os.walk(directory):
         for file in files:
             if file.endswith(".json"):
-                with open(os.path.join(root, file), "r") as json_file:
-                    ships.append(Ship.create_from_json(json.load(json_file), standard_modules, ship_name_to_symbol))
-
-    with open(PATH_TO_ENGINEERING_BLUEPRINTS, "r") as blueprints_file:
-        blueprints = json.load(blueprints_file)
-    with open(PATH_TO_SHIELD_BOOSTER_ENGINEERING_SPECIALS, "r") as specials_file:
-        engineering_specials = json.load(specials_file)
-    with open(PATH_TO_SHIELD_BOOSTER_ENGINEERING_SPECIAL_ACTIONS, "r") as specials_actions_file:
-        engineering_special_actions = json.load(specials_actions_file)
-
-    # shield generators
-    shield_generator_modules = {"bi-weave": load_shield_generators(PATH_TO_SHIELD_GENERATORS_BIWEAVE),
-                                "prismatic": load_shield_generators(PATH_TO_SHIELD_GENERATORS_PRISMATIC),
-                                "normal": load_shield_generators(PATH_TO_SHIELD_GENERATORS_NORMAL)}
-
-    # blueprints for shield generators
-    shield_generator_engineering_blueprints = list()
-    for blueprint_symbol in MODULE_SHIELD_GENERATOR_ENGINEERING_BLUEPRINTS:
-        # extract only the best value from the features
-        features = dict()
-        for k, v in blueprints[blueprint_symbol]["grades"]["5"]["features"].items():
-            features.setdefault(k, v[1])
-        sg_blueprint = {"symbol": blueprints[blueprint_symbol]["fdname"],
-                        "features": features,
-                        "name": blueprints[blueprint_symbol]["name"]}
-        shield_generator_engineering_blueprints.append(sg_blueprint)
-
-    # experimental effects for shield generators
-    shield_generator_engineering_experimentals = list()
-    for experimental_symbol in MODULE_SHIELD_GENERATOR_ENGINEERING_SPECIALS:
-        experimental = {"symbol": engineering_specials[experimental_symbol]["edname"],
-                        "name": engineering_specials[experimental_symbol]["name"],
-                        "features": engineering_special_actions[experimental_symbol]}
-        shield_generator_engineering_experimentals.append(experimental)
-
-    # put all information about shield generators in 1 dictionary
-    shield_generators = {"modules": shield_generator_modules,
-                         "engineering": {"blueprints": shield_generator_engineering_blueprints,
-                                         "experimental_effects": shield_generator_engineering_experimentals}
-                         }
-
-    # shield boosters
-    shield_booster_variants = list()
-    with open(PATH_TO_SHIELD_BOOSTER, "r") as boosters_file:
+                ship_files.append(os.path.join(root, file))
+    return sorted(ship_files)  # os.walk does not guarantee any order
+
+
+def load_ship(filename: str, standard_modules: Dict[str, Dict[Tuple[int, str], str]], ship_name_to_symbol: Dict[str, str]) -> Dict:
+    """
+    Read a coriolis ship file and convert it into its data entry.
+    :param filename: path of the ship file, e.g. coriolis-data/ships/adder.json
+    :param standard_modules: Default fitted modules as defined in coriolis-data/modules/standard/*
+    :param ship_name_to_symbol: Dictionary containing the ship name as key and the internal identifier (symbol) as value
+    :return: data entry of the ship
+    """
+    ship = Ship.create_from_json(source_loader.load_json(filename), standard_modules, ship_name_to_symbol)
+    return ship.generate_data_entry()
+
+
+# standard modules and ship symbols of a worker, sent once when the worker starts instead of with every ship file
+_ship_worker_context = dict()
+
+
+def _init_ship_worker(standard_modules: Dict[str, Dict[Tuple[int, str], str]], ship_name_to_symbol: Dict[str, str],
+                      source_directory: Optional[str], source_digests: Dict[str, str]):
+    source_loader.directory = source_directory
+    source_loader.digests = source_digests
+    _ship_worker_context["standard_modules"] = standard_modules
+    _ship_worker_context["ship_name_to_symbol"] = ship_name_to_symbol
+
+
+def _load_ship_in_worker(filename: str) -> Dict:
+    return load_ship(filename, _ship_worker_context["standard_modules"], _ship_worker_context["ship_name_to_symbol"])
+
+
+def load_ships(filenames: List[str], standard_modules: Dict[str, Dict[Tuple[int, str], str]], ship_name_to_symbol: Dict[str, str],
+               workers: int = 1, executor: str = "process") -> List[Dict]:
+    """
+    Load several ship files, optionally in a pool of workers.
+    :param filenames: paths of the ship files
+    :param standard_modules: Default fitted modules as defined in coriolis-data/modules/standard/*
+    :param ship_name_to_symbol: Dictionary containing the ship name as key and the internal identifier (symbol) as value
+    :param workers: number of workers, 1 loads the files in this thread
+    :param executor: "process" or "thread"
+    :return: data entries in the same order as filenames
+    """
+    if workers <= 1 or len(filenames) < 2:
+        return [load_ship(filename, standard_modules, ship_name_to_symbol) for filename in filenames]
+
+    executor_class = concurrent.futures.ProcessPoolExecutor if executor == "process" else concurrent.futures.ThreadPoolExecutor
+    initargs = (standard_modules, ship_name_to_symbol, source_loader.directory, source_loader.digests)
+    with executor_class(max_workers=workers, initializer=_init_ship_worker, initargs=initargs) as pool:
+        # map keeps the order of filenames, chunks keep the overhead per file low
+        return list(pool.map(_load_ship_in_worker, filenames, chunksize=max(1, len(filenames) // (workers * 4))))
+
+
+def _git(directory: str, *arguments: str) -> str:
+    try:
+        return subprocess.run(["git", "-C", directory] + list(arguments), check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise ValueError("git {} failed in {}: {}".format(" ".join(arguments), directory, (getattr(e, "stderr", None) or str(e)).strip()))
+
+
+def _submodule_commit(root: str, revision: str, submodule: str) -> str:
+    # a submodule is stored as a commit id (mode 160000) in the tree of the superproject
+    entry = _git(root, "ls-tree", revision, "--", submodule).split()
+    if len(entry) < 3 or entry[0] != "160000":
+        raise ValueError("{} is not a submodule in revision {}".format(submodule, revision))
+    return entry[2]
+
+
+@contextlib.contextmanager
+def checkout_snapshot(snapshot: str, root: str):
+    """
+    Provide the sources of a snapshot. Revisions are checked out from the local submodule repositories only, nothing is fetched.
+    :param snapshot: directory containing coriolis-data and FDevIDs or git:REVISION of the repository in root
+    :param root: checkout of this repository with the submodules coriolis-data and FDevIDs, e.g. --root
+    :return: context manager yielding the directory of the snapshot, checked out revisions are removed when it exits
+    """
+    if not snapshot.startswith(SNAPSHOT_GIT_PREFIX):
+        yield snapshot
+        return
+
+    revision = snapshot[len(SNAPSHOT_GIT_PREFIX):]
+    snapshot_root = tempfile.mkdtemp(prefix="snapshot-")
+    worktrees = list()
+    try:
+        for submodule in SNAPSHOT_SUBMODULES:
+            commit = _submodule_commit(root, revision, submodule)
+            worktree = os.path.join(snapshot_root, submodule)
+            _git(os.path.join(root, submodule), "worktree", "add", "--detach", worktree, commit)
+            worktrees.append((submodule, worktree))
+        yield snapshot_root
+    finally:
+        for submodule, worktree in worktrees:
+            with contextlib.suppress(ValueError):
+                _git(os.path.join(root, submodule), "worktree", "remove", "--force", worktree)
+        shutil.rmtree(snapshot_root, ignore_errors=True)
+
+
+def snapshot_labels(snapshots: List[str]) -> List[str]:
+    """
+    :param snapshots: directories or git:REVISION
+    :return: unique names of the snapshots that can be used in file names, e.g. v3.5 for git:v3.5
+    """
+    labels = list()
+    for snapshot in snapshots:
+        if snapshot.startswith(SNAPSHOT_GIT_PREFIX):
+            label = snapshot[len(SNAPSHOT_GIT_PREFIX):]
+        else:
+            label = os.path.basename(os.path.normpath(os.path.abspath(snapshot)))
+        label = re.sub(r"[^\w.-]+", "_", label).strip("._") or "snapshot"
+        unique_label, number = label, 1
+        while unique_label in labels:
+            number += 1
+            unique_label = "{}-{}".format(label, number)
+        labels.append(unique_label)
+    return labels
+
+
+def snapshot_filename(filename: str, label: str) -> str:
+    root, extension = os.path.splitext(filename)
+    return "{}.{}{}".format(root, label, extension)
+
+
+def _diff_entries(old_entries: Dict[str, Dict], new_entries: Dict[str, Dict], keys: Optional[List[str]] = None) -> Dict:
+    changed = dict()
+    for name in sorted(set(old_entries) & set(new_entries)):
+        old_entry, new_entry = old_entries[name], new_entries[name]
+        changed_keys = [key for key in (keys or sorted(set(old_entry) | set(new_entry))) if old_entry.get(key) != new_entry.get(key)]
+        if changed_keys:
+            changed[name] = changed_keys
+    return {"added": sorted(set(new_entries) - set(old_entries)),
+            "removed": sorted(set(old_entries) - set(new_entries)),
+            "changed": changed}
+
+
+def _shield_booster_variant_name(variant_entry: Dict) -> str:
+    loadout_template = variant_entry["loadout_template"]
+    engineering = loadout_template["Engineering"]
+    return "{} {} G{} Q{} {}".format(loadout_template["Item"], engineering["BlueprintName"], engineering["Level"], engineering["Quality"],
+                                     engineering["ExperimentalEffect"])
+
+
+def diff_data(old_data: Dict, new_data: Dict) -> Dict:
+    """
+    Summarise which ships, shield generators and shield booster stats differ between two data files.
+    :param old_data: data of the older snapshot as returned by load_data_file
+    :param new_data: data of the newer snapshot
+    :return: added and removed symbols and the names of the changed values of every changed entry per section
+    """
+    def shield_generators(data: Dict) -> Dict[str, Dict]:
+        return dict((x["symbol"], x) for generators in data["shield_generators"]["modules"].values() for x in generators)
+
+    def shield_booster_variants(data: Dict) -> Dict[str, Dict]:
+        return dict((_shield_booster_variant_name(x), x) for x in data["shield_booster_variants"])
+
+    return {"ships": _diff_entries(dict((x["symbol"], x) for x in old_data["ships"]), dict((x["symbol"], x) for x in new_data["ships"])),
+            "shield_generators": _diff_entries(shield_generators(old_data), shield_generators(new_data)),
+            "shield_booster_variants": _diff_entries(shield_booster_variants(old_data), shield_booster_variants(new_data),
+                                                     ["shield_strength_bonus"] + list(DAMAGE_TYPE_RESISTANCES.values()))}
+
+
+def _build_snapshot(args: argparse.Namespace) -> str:
+    # the output of the snapshots built in parallel is printed together when they are done
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        build(args)
+    return output.getvalue()
+
+
+class ServedData:
+    """
+    One version of the data served by DataService, encoded as compact json once instead of for every request.
+    """
+    def __init__(self, data: Dict, version: int):
+        self.version = version
+        self.responses = dict()  # path -> compact json
+        self.responses["/"] = ServedData._encode({"version": version, "sections": sorted(data)})
+        for section, value in data.items():
+            self.responses["/" + section] = ServedData._encode(value)
+        for ship_entry in data.get("ships", list()):
+            self.responses["/ships/" + ship_entry["symbol"]] = ServedData._encode(ship_entry)
+        for shield_generators in data.get("shield_generators", dict()).get("modules", dict()).values():
+            for shield_generator in shield_generators:
+                self.responses["/shield_generators/" + shield_generator["symbol"]] = ServedData._encode(shield_generator)
+
+    @staticmethod
+    def _encode(value: json) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+class DataService:
+    """
+    Keeps the data in memory and rebuilds it when a source file changes. Only the entries derived from changed files are rebuilt,
+    see BuildCache. Requests are answered from the last successful build while a new one is running.
+    """
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.served = None  # ServedData
+        self.signature = None  # modification time and size of every source file of the served data
+
+    def source_signature(self) -> List[Tuple[str, int, int]]:
+        source_root = SourceRoot(os.path.abspath(self.args.root))
+        source_files = find_ship_files(source_root.ships) + [source_root.shipyard, source_root.shield_booster, source_root.engineering_blueprints,
+                                                             source_root.engineering_specials, source_root.engineering_special_actions]
+        source_files += [os.path.join(source_root.modules_standard, file) for file in sorted(MODULES_STANDARD_FILE_NAMES.values())]
+        source_files += list(source_root.shield_generators.values())
+        signature = list()
+        for source_file in source_files:
+            try:
+                stat = os.stat(source_file)
+                signature.append((source_file, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((source_file, 0, 0))  # the build reports the missing file
+        return signature
+
+    def update(self) -> bool:
+        """
+        Rebuild and reload the data if a source file changed since the last build.
+        :return: True if new data is served
+        """
+        signature = self.source_signature()
+        if signature == self.signature:
+            return False
+        # the signature is taken first, changes during the build are picked up by the next update
+        self.signature = signature
+        if build(self.args) or self.served is None:
+            self.served = ServedData(load_data_file(self.args.output, resolve_templates=True), 1 if self.served is None else self.served.version + 1)
+            print("serving version {}".format(self.served.version))
+            return True
+        return False
+
+    def watch(self, stop: threading.Event):
+        """
+        Poll the source files until stop is set. A failed build is reported and the previous data stays served.
+        """
+        while not stop.wait(self.args.poll):
+            try:
+                self.update()
+            except Exception as e:  # a broken source file can raise anything, the watcher has to keep polling
+                print("build failed, still serving version {}: {}".format(self.served.version, e))
+
+
+class DataRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    GET / lists the sections, /SECTION returns a section of data.json, /ships/SYMBOL and /shield_generators/SYMBOL a single entry.
+    The ETag of a response is the version of the data.
+    """
+    protocol_version = "HTTP/1.1"  # keep the connections of the workers open
+    service = None  # DataService, set by serve
+
+    def do_GET(self):
+        served = self.service.served
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path).rstrip("/") or "/"
+        body = served.responses.get(path)
+        if body is None:
+            self.send_error(404, "no data at {}".format(path))
+            return
+        etag = '"{}"'.format(served.version)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # unix sockets have no client address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_request(self, code="-", size="-"):
+        pass  # only errors are logged, there are too many requests
+
+
+class _DataServerMixin:
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):  # clients going away, e.g. stopped workers, are no error
+            super().handle_error(request, client_address)
+
+
+class DataHTTPServer(_DataServerMixin, http.server.ThreadingHTTPServer):
+    pass
+
+
+class DataUnixHTTPServer(_DataServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def _raise_keyboard_interrupt():
+    raise KeyboardInterrupt
+
+
+def serve(args: argparse.Namespace):
+    """
+    Build the data and serve it until interrupted, see DataService and DataRequestHandler.
+    :param args: parsed command line of main, args.serve is HOST:PORT or unix:PATH
+    """
+    service = DataService(args)
+    service.update()
+    handler = type("ServiceRequestHandler", (DataRequestHandler,), {"service": service})
+    if args.serve.startswith(SERVICE_UNIX_PREFIX):
+        socket_path = args.serve[len(SERVICE_UNIX_PREFIX):]
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)  # left behind by a previous service
+        server = DataUnixHTTPServer(socket_path, handler)
+    else:
+        socket_path = None
+        host, _, port = args.serve.rpartition(":")
+        try:
+            server = DataHTTPServer((host or "127.0.0.1", int(port)), handler)
+        except ValueError:
+            raise ValueError("--serve: '{}' is not HOST:PORT or unix:PATH".format(args.serve))
+
+    if threading.current_thread() is threading.main_thread():
+        # stopped like with ctrl-c, so the socket is removed
+        signal.signal(signal.SIGTERM, lambda signal_number, frame: _raise_keyboard_interrupt())
+    stop = threading.Event()
+    watcher = threading.Thread(target=service.watch, args=(stop,), daemon=True)
+    watcher.start()
+    print("serving {} on {}".format(args.output, args.serve))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        if socket_path is not None:
+            with contextlib.suppress(OSError):
+                os.remove(socket_path)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Create data.json for the shield tester from coriolis-data and FDevIDs.")
+    parser.add_argument("--force", action="store_true", help="ignore the build cache and rebuild every entry")
+    parser.add_argument("--root", default=os.getcwd(), metavar="DIR",
+                        help="directory containing coriolis-data and FDevIDs (default: %(default)s)")
+    parser.add_argument("--snapshots", nargs="+", default=None, metavar="SNAPSHOT",
+                        help="build several snapshots of the sources in parallel and compare them, each snapshot is a directory "
+                             "or git:REVISION to use the submodule commits of a revision of the repository in --root")
+    parser.add_argument("--serve", nargs="?", const=SERVICE_ADDRESS, default=None, metavar="ADDRESS",
+                        help="keep the data in memory, rebuild it when the sources change and serve it over HTTP on HOST:PORT or "
+                             "unix:PATH (default address: %(const)s)")
+    parser.add_argument("--poll", type=float, default=1.0, metavar="SECONDS",
+                        help="interval of --serve to check the sources for changes (default: %(default)s)")
+    parser.add_argument("--cache", default=PATH_TO_BUILD_CACHE, help="path of the build cache (default: %(default)s)")
+    parser.add_argument("--output", default=PATH_TO_OUTPUT, help="path of the generated file (default: %(default)s)")
+    parser.add_argument("--booster-tables", nargs="?", const=PATH_TO_SHIELD_BOOSTER_TABLES, default=None, metavar="PATH",
+                        help="also write precomputed shield booster combinations (default path: %(const)s)")
+    parser.add_argument("--columns", nargs="?", const=PATH_TO_COLUMNS, default=None, metavar="PATH",
+                        help="also write the numbers of shield boosters and generators as columns that can be memory mapped "
+                             "(default path: %(const)s)")
+    parser.add_argument("--numpy", action="store_true", help="engineer and combine shield boosters with numpy")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of workers loading ship files or building --snapshots (default: %(default)s)")
+    parser.add_argument("--executor", choices=["process", "thread"], default="process", help="kind of worker (default: %(default)s)")
+    parser.add_argument("--format", choices=DATA_FORMATS, default="json",
+                        help="json: indented, compact: json without whitespace, records/msgpack: length-prefixed binary records "
+                             "with json/MessagePack payloads (default: %(default)s)")
+    parser.add_argument("--prune-dominated", action="store_true",
+                        help="drop shield booster variants that are not better than another variant on any axis")
+    parser.add_argument("--damage-profile", default=None, metavar="PROFILE",
+                        help="damage types considered by --prune-dominated, e.g. kinetic,thermal (default: all)")
+    parser.add_argument("--shared-templates", action="store_true",
+                        help="store repeated parts of loadout templates once in shared_templates and refer to them by index")
+    parser.add_argument("--sweep", action="store_true",
+                        help="include shield generators and boosters of all ratings and boosters of all blueprint grades with min, mid and max rolls")
+    parser.add_argument("--shard-by", choices=["ship-class", "generator-class"], default=None,
+                        help="write one file per ship class or per shield generator class instead of a single file")
+    parser.add_argument("--generator-candidates", action="store_true",
+                        help="list the shield generators every ship can fit with their shield strength for all blueprints and experimental effects")
+    parser.add_argument("--source-cache", default=PATH_TO_SOURCE_CACHE, metavar="DIR",
+                        help="directory of parsed source files, reused while their modification time and size are unchanged "
+                             "(default: %(default)s)")
+    parser.add_argument("--no-source-cache", action="store_true", help="parse all source files again")
+    parser.add_argument("--profile", default=None, metavar="PATH", help="write the time and memory of every build stage to PATH")
+    parser.add_argument("--profile-format", choices=["json", "chrome"], default="json",
+                        help="json report or chrome://tracing / Perfetto trace (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.sweep and (args.prune_dominated or args.booster_tables):
+        parser.error("--sweep can't be combined with --prune-dominated or --booster-tables, both need all variants in memory")
+    if args.numpy and numpy is None:
+        parser.error("--numpy requires numpy")
+    if args.format == "msgpack" and msgpack is None:
+        parser.error("--format msgpack requires msgpack")
+    if args.damage_profile is not None:
+        try:
+            args.damage_profile = parse_damage_profile(args.damage_profile)
+        except ValueError as e:
+            parser.error("--damage-profile: {}".format(e))
+    if args.snapshots and args.shard_by:
+        parser.error("--snapshots can't be combined with --shard-by, the snapshots are compared as single files")
+    if args.serve and (args.snapshots or args.shard_by):
+        parser.error("--serve can't be combined with --snapshots or --shard-by, it serves a single data file")
+
+    try:
+        if args.snapshots:
+            build_snapshots(args)
+        elif args.serve:
+            serve(args)
+        else:
+            build(args)
+    except ValueError as e:
+        sys.exit("error: {}".format(e))
+
+
+def build(args: argparse.Namespace) -> bool:
+    """
+    Build the data file of one source root.
+    :param args: parsed command line of main
+    :return: False if the data file was already up to date
+    """
+    profiler = BuildProfiler(enabled=args.profile is not None)
+    try:
+        return _build(args, profiler)
+    finally:
+        profiler.stop()
+
+
+def _build(args: argparse.Namespace, profiler: BuildProfiler) -> bool:
+    source_root = SourceRoot(os.path.abspath(args.root))
+    options = {"output": os.path.abspath(args.output),
+               "booster_tables": args.booster_tables and os.path.abspath(args.booster_tables),
+               "numpy": args.numpy,
+               "format": args.format,
+               "shared_templates": args.shared_templates,
+               "prune_dominated": args.prune_dominated,
+               "damage_profile": args.damage_profile,
+               "sweep": args.sweep,
+               "shard_by": args.shard_by,
+               "generator_candidates": args.generator_candidates,
+               "columns": args.columns and os.path.abspath(args.columns)}
+
+    source_loader.directory = None if args.no_source_cache else args.source_cache
+    parsed_before = source_loader.misses  # files parsed by earlier builds of this process
+    cache = BuildCache(args.cache, force=args.force)
+    ship_files = find_ship_files(source_root.ships)
+    ship_dependencies = [source_root.shipyard] + [os.path.join(source_root.modules_standard, file)
+                                                  for file in sorted(MODULES_STANDARD_FILE_NAMES.values())]
+    shield_generator_files = source_root.shield_generators
+
+    source_files = source_root.files()
+    profiler.add_inputs(source_files)
+    with profiler.stage("hash sources", files=len(source_files)):
+        digests = dict((os.path.abspath(path), Utilities.file_digest(path)) for path in source_files)
+    sources = dict((os.path.relpath(path, source_root.root), digest) for path, digest in digests.items())
+    # the loader parses the same content the cache entries are derived from, even if a file changed without a new modification time
+    source_loader.digests = digests
+    if cache.is_up_to_date(sources, options):
+        print("{} is up to date".format(args.output))
+        if args.profile:
+            profiler.save(args.profile, args.profile_format)
+        return False
+
+    ship_dependencies_digest = Utilities.json_digest([sources[os.path.relpath(path, source_root.root)] for path in ship_dependencies])
+    ship_digests = dict((ship_file, Utilities.json_digest(sources[os.path.relpath(ship_file, source_root.root)], ship_dependencies_digest))
+                        for ship_file in ship_files)
+    ship_keys = dict((ship_file, os.path.relpath(ship_file, source_root.ships)) for ship_file in ship_files)
+
+    # standard modules and ship symbols are only read when at least one ship has to be rebuilt
+    changed_ship_files = [x for x in ship_files if not cache.is_cached("ships", ship_keys[x], ship_digests[x])]
+    changed_ships = dict()
+    if changed_ship_files:
+        with profiler.stage("load standard modules"):
+            standard_modules = load_standard_modules(source_root.modules_standard)
+        with profiler.stage("read shipyard"):
+            ship_name_to_symbol = load_ship_name_to_symbol(source_root.shipyard)
+        with profiler.stage("create ships", ships=len(changed_ship_files), workers=args.workers):
+            changed_ships = dict(zip(changed_ship_files, load_ships(changed_ship_files, standard_modules, ship_name_to_symbol,
+                                                                    workers=args.workers, executor=args.executor)))
+
+    with profiler.stage("parse engineering files"):
+        blueprints = source_loader.load_json(source_root.engineering_blueprints)
+        engineering_specials = source_loader.load_json(source_root.engineering_specials)
+        engineering_special_actions = source_loader.load_json(source_root.engineering_special_actions)
+
+    # shield generators, loaded first because they decide the shards of the ships
+    shield_generator_modules = dict()
+    with profiler.stage("load shield generators"):
+        for generator_type, filename in shield_generator_files.items():
+            shield_generator_modules[generator_type] = cache.get("shield_generators", generator_type,
+                                                                 Utilities.json_digest(sources[os.path.relpath(filename, source_root.root)], args.sweep),
+                                                                 lambda: load_shield_generators(filename, all_ratings=args.sweep))
+            profiler.count("shield_generators", len(shield_generator_modules[generator_type]))
+
+    # engineering of shield generators, needed by the ships for their generator candidates
+    def build_shield_generator_engineering() -> Dict:
+        # blueprints for shield generators
+        shield_generator_engineering_blueprints = list()
+        for blueprint_symbol in sorted(MODULE_SHIELD_GENERATOR_ENGINEERING_BLUEPRINTS):
+            # extract only the best value from the features
+            features = dict()
+            for k, v in blueprints[blueprint_symbol]["grades"]["5"]["features"].items():
+                features.setdefault(k, v[1])
+            sg_blueprint = {"symbol": blueprints[blueprint_symbol]["fdname"],
+                            "features": features,
+                            "name": blueprints[blueprint_symbol]["name"]}
+            shield_generator_engineering_blueprints.append(sg_blueprint)
+
+        # experimental effects for shield generators
+        shield_generator_engineering_experimentals = list()
+        for experimental_symbol in sorted(MODULE_SHIELD_GENERATOR_ENGINEERING_SPECIALS):
+            experimental = {"symbol": engineering_specials[experimental_symbol]["edname"],
+                            "name": engineering_specials[experimental_symbol]["name"],
+                            "features": engineering_special_actions[experimental_symbol]}
+            shield_generator_engineering_experimentals.append(experimental)
+
+        return {"blueprints": shield_generator_engineering_blueprints,
+                "experimental_effects": shield_generator_engineering_experimentals}
+
+    shield_generator_engineering_digest = Utilities.json_digest([blueprints.get(symbol) for symbol in sorted(MODULE_SHIELD_GENERATOR_ENGINEERING_BLUEPRINTS)],
+                                                                [(engineering_specials.get(symbol), engineering_special_actions.get(symbol))
+                                                                 for symbol in sorted(MODULE_SHIELD_GENERATOR_ENGINEERING_SPECIALS)])
+    shield_generator_engineering = cache.get("shield_generator_engineering", "engineering", shield_generator_engineering_digest,
+                                             build_shield_generator_engineering)
+    shield_generator_candidates_digest = Utilities.json_digest(shield_generator_modules, shield_generator_engineering)
+
+    generator_classes = sorted(set(x["class"] for generators in shield_generator_modules.values() for x in generators))
+
+    def ship_shards(ship_entry: Dict) -> Optional[List[str]]:
+        if args.shard_by == "ship-class":
+            return ["ship-class-{}".format(ship_entry["ship_class"])]
+        if args.shard_by == "generator-class":
+            fitting_classes = set(x["class"] for generators in shield_generator_modules.values() for x in generators
+                                  if can_fit_shield_generator(ship_entry, x))
+            return ["generator-class-{}".format(x) for x in generator_classes if x in fitting_classes]
+        return None  # all shards
+
+    def shield_generator_shard(shard: str) -> Dict:
+        if args.shard_by != "generator-class":
+            return shield_generators
+        generator_class = int(shard.rsplit("-", 1)[1])
+        return dict(shield_generators, modules=dict((generator_type, [x for x in generators if x["class"] == generator_class])
+                                                    for generator_type, generators in shield_generator_modules.items()))
+
+    with profiler.stage("write output", format=args.format), \
+            ShardedDataWriter(args.output, args.format, sharded=args.shard_by is not None, shared_templates=args.shared_templates) as writer:
+        if args.shard_by == "generator-class":
+            writer.add_shards(["generator-class-{}".format(x) for x in generator_classes])
+
+        # ships are written as soon as they are available
+        max_boosters = 0
+        with profiler.stage("write ships", ships=len(ship_files)):
+            writer.begin_list("ships")
+            for ship_file in ship_files:
+                ship_entry = cache.get("ships", ship_keys[ship_file], ship_digests[ship_file], lambda: changed_ships[ship_file])
+                max_boosters = max(max_boosters, ship_entry["utility_slots"])
+                if args.generator_candidates:
+                    candidates = cache.get("shield_generator_candidates", ship_keys[ship_file],
+                                           Utilities.json_digest(ship_digests[ship_file], shield_generator_candidates_digest),
+                                           lambda: generate_shield_generator_candidates(ship_entry, shield_generator_modules, shield_generator_engineering))
+                    ship_entry = dict(ship_entry, shield_generator_candidates=candidates)
+                shards = ship_shards(ship_entry)
+                if shards == []:
+                    print("{} can't fit any shield generator, it is left out of all shards".format(ship_entry["ship"]))
+                if not args.sweep and not args.shard_by:
+                    # ship_class only describes the shards and sweeps, without them data.json is the same as before
+                    ship_entry = dict((key, value) for key, value in ship_entry.items() if key != "ship_class")
+                writer.write_item(ship_entry, shards)
+            writer.end_list()
+        changed_ships.clear()
+        profiler.count("ships", len(ship_files))
+
+        # shield boosters
+        boosters_json = next(iter(source_loader.load_json(source_root.shield_booster).values()))
         booster_json = None
-        for booster in next(iter(json.load(boosters_file).values())):
+        for booster in boosters_json:
             if booster["rating"] == "A":
                 booster_json = booster
                 break
         shield_booster_default = ShieldBooster.create_from_json(booster_json)
-        for blueprint_symbol in MODULE_SHIELD_BOOSTER_ENGINEERING_BLUEPRINTS:
-                shield_booster_variants += ShieldBooster.create_engineered(shield_booster_default, blueprints.get(blueprint_symbol),
-                                                                           engineering_specials, engineering_special_actions)
 
-    data_entries_ships = list()
-    for ship in ships:
-        data_entries_ships.append(ship.generate_data_entry())
+        def build_shield_booster_variants(blueprint_symbol: str) -> List[Dict]:
+            if args.numpy:
+                variants = ShieldBoosterTable.create_engineered([shield_booster_default], [blueprints.get(blueprint_symbol)],
+                                                                engineering_specials, engineering_special_actions).to_shield_boosters()
+            else:
+                variants = ShieldBooster.create_engineered(shield_booster_default, blueprints.get(blueprint_symbol),
+                                                           engineering_specials, engineering_special_actions)
+            return [x.generate_data_entry(shield_booster_default) for x in variants]
+
+        if args.sweep:
+            # expanded while writing, the variants are never held in memory together
+            shield_booster_variants = iter_shield_booster_variants(boosters_json, blueprints, engineering_specials, engineering_special_actions,
+                                                                   SWEEP_GRADES, list(SWEEP_ROLLS.values()), args.numpy)
+        else:
+            with profiler.stage("engineer shield boosters", numpy=args.numpy):
+                shield_booster_specials_digest = Utilities.json_digest([(engineering_specials.get(symbol), engineering_special_actions.get(symbol))
+                                                                        for symbol in sorted(MODULE_SHIELD_BOOSTER_ENGINEERING_SPECIALS)])
+                shield_booster_variants = list()
+                for blueprint_symbol in sorted(MODULE_SHIELD_BOOSTER_ENGINEERING_BLUEPRINTS):
+                    digest = Utilities.json_digest(booster_json, blueprints.get(blueprint_symbol), shield_booster_specials_digest, args.numpy)
+                    shield_booster_variants += cache.get("shield_booster_variants", blueprint_symbol, digest,
+                                                         lambda: build_shield_booster_variants(blueprint_symbol))
+            if args.prune_dominated:
+                with profiler.stage("prune shield boosters", variants=len(shield_booster_variants)):
+                    shield_booster_variants, pruned_shield_booster_variants = prune_dominated_variants(shield_booster_variants, args.damage_profile)
+
+        shield_booster_columns = dict((column, array.array("d")) for column in SHIELD_BOOSTER_COLUMNS)
+        with profiler.stage("write shield boosters") as stage:
+            stage["variants"] = 0
+            writer.begin_list("shield_booster_variants")
+            for variant_entry in shield_booster_variants:
+                writer.write_item(variant_entry)
+                stage["variants"] += 1
+                if args.columns:
+                    for column, values in shield_booster_columns.items():
+                        values.append(variant_entry[column])
+            writer.end_list()
+        profiler.count("shield_booster_variants", stage["variants"])
+        if args.prune_dominated:
+            writer.write_value("pruned_shield_booster_variants", pruned_shield_booster_variants)
+
+        # put all information about shield generators in 1 dictionary
+        with profiler.stage("write shield generators"):
+            shield_generators = {"modules": shield_generator_modules,
+                                 "engineering": shield_generator_engineering}
+            writer.write_value("shield_generators", shield_generators, shield_generator_shard)
+
+        if args.booster_tables:
+            with profiler.stage("shield booster tables", boosters=max_boosters):
+                booster_stats = [(x["shield_strength_bonus"], x["exp_res_bonus"], x["kin_res_bonus"], x["therm_res_bonus"]) for x in shield_booster_variants]
+                tables_index = cache.get("shield_booster_tables", "tables", Utilities.json_digest(booster_stats, max_boosters, args.numpy),
+                                         lambda: generate_shield_booster_tables(shield_booster_variants, max_boosters, args.booster_tables, args.numpy),
+                                         outputs=[args.booster_tables])
+            # the file is referenced relative to data.json
+            writer.write_value("shield_booster_tables",
+                               dict(tables_index, file=os.path.relpath(args.booster_tables, os.path.dirname(os.path.abspath(args.output)))))
+
+        if args.columns:
+            with profiler.stage("write columns"):
+                shield_generator_list = [x for generators in shield_generator_modules.values() for x in generators]
+                shield_generator_columns = dict((column, array.array("d", (x[column] for x in shield_generator_list)))
+                                                for column in SHIELD_GENERATOR_COLUMNS)
+                columns_index = write_columns(args.columns, {"shield_booster_variants": shield_booster_columns,
+                                                             "shield_generators": shield_generator_columns},
+                                              {"shield_generators": [x["symbol"] for x in shield_generator_list]})
+            writer.write_value("columns", dict(columns_index, file=os.path.relpath(args.columns, os.path.dirname(os.path.abspath(args.output)))))
+
+    extra_outputs = [x for x in (args.booster_tables, args.columns) if x]
+    cache.save(sources, options, writer.outputs + extra_outputs)
+
+    for section, key in cache.rebuilt:
+        print("rebuilt {}: {}".format(section, key))
+    for section, key in cache.removed():
+        print("removed {}: {}".format(section, key))
+    print("{} of {} entries rebuilt".format(len(cache.rebuilt), sum(len(entries) for entries in cache.used_sections.values())))
+
+    if args.profile:
+        profiler.count("rebuilt_entries", len(cache.rebuilt))
+        profiler.count("parsed_source_files", source_loader.misses - parsed_before)
+        profiler.count("output_bytes", sum(os.path.getsize(path) for path in writer.outputs))
+        profiler.save(args.profile, args.profile_format)
+    return True
+
+
+def preload_sources(source_roots: List[SourceRoot]) -> int:
+    """
+    Parse the source files of several roots with source_loader, files with the same content only once.
+    Processes forked afterwards find the parsed files in their copy of source_loader instead of parsing them again.
+    :return: number of source files
+    """
+    files = 0
+    for source_root in source_roots:
+        for path in source_root.files():
+            source_loader.digests[os.path.abspath(path)] = Utilities.file_digest(path)
+            if path == source_root.shipyard:
+                source_loader.load_csv(path)
+            else:
+                source_loader.load_json(path)
+            files += 1
+    return files
+
+
+def build_snapshots(args: argparse.Namespace):
+    """
+    Build the data file of several snapshots of the sources in a pool of processes and write the differences to the previous snapshot.
+    The sources of all snapshots are parsed before the pool is forked, files with the same content are only parsed once.
+    :param args: parsed command line of main, --output, --cache, --booster-tables, --columns and --profile get the name of the snapshot added
+    """
+    labels = snapshot_labels(args.snapshots)
+    with contextlib.ExitStack() as checkouts:
+        snapshots_args = list()
+        for snapshot, label in zip(args.snapshots, labels):
+            snapshot_args = argparse.Namespace(**vars(args))
+            snapshot_args.root = checkouts.enter_context(checkout_snapshot(snapshot, args.root))
+            snapshot_args.snapshots = None
+            snapshot_args.workers = 1  # the snapshots are built in parallel instead of their ships
+            for option in ("output", "cache", "booster_tables", "columns", "profile"):
+                if getattr(args, option):
+                    setattr(snapshot_args, option, snapshot_filename(getattr(args, option), label))
+            snapshots_args.append(snapshot_args)
+
+        source_loader.directory = None if args.no_source_cache else args.source_cache
+        files = preload_sources([SourceRoot(os.path.abspath(x.root)) for x in snapshots_args])
+        print("{} source files of {} snapshots, {} parsed".format(files, len(snapshots_args), source_loader.misses))
 
-    # dictionary for output
-    data_entries = {"ships": data_entries_ships,
-                    "shield_booster_variants": [x.generate_data_entry(shield_booster_default) for x in shield_booster_variants],
-                    "shield_generators": shield_generators}
+        # only forked workers inherit the parsed files, other start methods parse them again
+        mp_context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(snapshots_args))), mp_context=mp_context) as pool:
+            for label, snapshot_output in zip(labels, pool.map(_build_snapshot, snapshots_args)):
+                print("{}:".format(label))
+                print(snapshot_output, end="")
 
-    with open("data.json", "w+") as ship_data_file:
-        json.dump(data_entries, ship_data_file, indent="  ")
+    for i in range(1, len(labels)):
+        diff = diff_data(load_data_file(snapshots_args[i - 1].output, resolve_templates=True),
+                         load_data_file(snapshots_args[i].output, resolve_templates=True))
+        diff_filename = "{}.{}.diff.json".format(os.path.splitext(args.output)[0], labels[i])
+        with open(diff_filename, "w") as diff_file:
+            json.dump(dict(diff, base=labels[i - 1], snapshot=labels[i]), diff_file, indent="  ")
+        print("{} -> {}: {}".format(labels[i - 1], labels[i], ", ".join("{} {} added, {} removed, {} changed".format(
+            len(section["added"]), name, len(section["removed"]), len(section["changed"])) for name, section in diff.items())))
 
 
 if __name__ == '__main__':